@@ -12,24 +12,40 @@ Case 3 自动化报告生成系统 - 命令行入口
     # 列出可用的公司
     python main.py --list
 
+    # 批量生成时限制并发数
+    python main.py --batch --concurrency 8
+
+    # 批量生成时通过提供商批处理接口提交(半价,异步完成)
+    python main.py --batch --batch-api
+
     # 指定输出路径
     python main.py --company EmergConnect --output output/custom_report.docx
 """
 
 import argparse
+import json
 import os
+import queue
 import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 
+from src.ai_generator import APIConfig
+from src.data_extractor import DataExtractor
+from src.orchestrator import ReportOrchestrator
+
 # 加载环境变量
 load_dotenv()
 
+# 批量生成时逐个公司追加的结果日志(JSONL)
+BATCH_RESULTS_LOG = "output/batch_results.jsonl"
+
 
 def get_api_config():
     """从环境变量获取 API 配置"""
-    from src.ai_generator import APIConfig
-
     # 优先使用OpenAI
     openai_key = os.getenv("OPENAI_API_KEY")
     if openai_key:
@@ -55,52 +71,70 @@ def get_api_config():
     )
 
 
+def get_extract_cache_dir():
+    """Excel提取结果的磁盘缓存目录(设置 EXTRACT_CACHE=1 时启用,否则为None)"""
+    if os.getenv("EXTRACT_CACHE") != "1":
+        return None
+    return os.getenv("EXTRACT_CACHE_DIR", ".cache")
+
+
 def list_companies():
     """列出所有可用的公司"""
-    from src.data_extractor import DataExtractor
-
     print("\n可用的公司列表:")
     print("-" * 40)
 
-    extractor = DataExtractor("data")
+    extractor = DataExtractor("data", cache_dir=get_extract_cache_dir())
 
-    # 从 SDG 问卷中获取公司
-    try:
-        sdg_data = extractor.extract_sdg_questionnaire("SDG问卷调查_完整中文版.xlsx")
-        companies_from_sdg = set(item.company_name for item in sdg_data if item.company_name)
-        print(f"\nSDG问卷中的公司 ({len(companies_from_sdg)}个):")
-        for company in sorted(companies_from_sdg):
-            print(f"  - {company}")
-    except Exception as e:
-        print(f"警告: 无法读取SDG问卷 - {e}")
+    # (标题, 错误提示, 读取函数); 各文件相互独立,并发读取后按顺序输出
+    sources = [
+        ("SDG问卷中的公司", "SDG问卷",
+         lambda: extractor.list_sdg_company_names("SDG问卷调查_完整中文版.xlsx")),
+        ("影响机制数据中的公司", "影响机制数据",
+         lambda: extractor.list_impact_company_names("影响评估机制_完整中文版.xlsx")),
+    ]
 
-    # 从影响机制中获取公司
-    try:
-        impact_data = extractor.extract_impact_mechanisms("影响评估机制_完整中文版.xlsx")
-        companies_from_impact = set(item.company_name for item in impact_data if item.company_name)
-        print(f"\n影响机制数据中的公司 ({len(companies_from_impact)}个):")
-        for company in sorted(companies_from_impact):
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = [executor.submit(read) for _, _, read in sources]
+
+    for (title, label, _), future in zip(sources, futures):
+        try:
+            # 读取函数返回的公司名已去重,只需排序一次用于展示
+            companies = sorted(future.result())
+        except Exception as e:
+            print(f"警告: 无法读取{label} - {e}")
+            continue
+
+        print(f"\n{title} ({len(companies)}个):")
+        for company in companies:
             print(f"  - {company}")
-    except Exception as e:
-        print(f"警告: 无法读取影响机制数据 - {e}")
 
     print()
 
 
-def generate_single_report(company_name: str, output_path: str = None):
-    """为单个公司生成报告"""
-    from src.orchestrator import ReportOrchestrator
+def create_orchestrator():
+    """创建报告编排器(加载配置并初始化API客户端)"""
+    return ReportOrchestrator(
+        data_dir="data",
+        config_path="config/template_mapping.yaml",
+        api_config=get_api_config(),
+        extract_cache_dir=get_extract_cache_dir()
+    )
+
+
+def generate_single_report(company_name: str, output_path: str = None, orchestrator=None):
+    """
+    为单个公司生成报告
 
+    Args:
+        company_name: 公司名称
+        output_path: 输出文件路径(可选)
+        orchestrator: 复用的报告编排器(可选,未提供时新建)
+    """
     print(f"\n正在为 {company_name} 生成报告...")
     print("-" * 40)
 
-    api_config = get_api_config()
-
-    orchestrator = ReportOrchestrator(
-        data_dir="data",
-        config_path="config/template_mapping.yaml",
-        api_config=api_config
-    )
+    if orchestrator is None:
+        orchestrator = create_orchestrator()
 
     try:
         result = orchestrator.generate_report(
@@ -123,49 +157,135 @@ def generate_single_report(company_name: str, output_path: str = None):
 
     except Exception as e:
         print(f"\n错误: 报告生成失败 - {e}")
-        import traceback
         traceback.print_exc()
         return False
 
 
-def generate_batch_reports():
-    """批量生成所有公司的报告"""
-    from src.data_extractor import DataExtractor
+def _run_batch(companies, orchestrators, results_log):
+    """
+    并发生成多个公司的报告
+
+    每个报告在线程池中执行: API调用为网络I/O(阻塞时释放GIL),
+    Excel/Word处理为同步阻塞操作,线程池都能直接承载。编排器在整个批次中复用
+    (配置、API客户端和连接池只初始化一次),但每个编排器保存单份报告的状态,
+    因此同一时刻只借给一个线程: 编排器池的大小即线程数。
 
+    每完成一个公司即向 results_log 写入一行JSON(公司、是否成功、耗时、Token数)
+    并刷新,内存中只保留成功计数和失败公司名,批次规模再大内存占用也保持平稳。
+
+    Returns:
+        tuple: (成功数, 失败公司名列表)
+    """
+    pool = queue.Queue()
+    for orchestrator in orchestrators:
+        pool.put(orchestrator)
+
+    total = len(companies)
+
+    def run(index: int, company: str):
+        orchestrator = pool.get()
+        try:
+            print(f"\n[{index}/{total}] 处理: {company}")
+            start_time = time.time()
+            ok = generate_single_report(company, None, orchestrator)
+            # 生成器的Token统计在每份报告开始时重置,归还编排器前读取
+            tokens = orchestrator.ai_generator.get_total_usage().total_tokens
+            return ok, time.time() - start_time, tokens
+        finally:
+            pool.put(orchestrator)
+
+    success_count = 0
+    failed_companies = []
+
+    with ThreadPoolExecutor(max_workers=len(orchestrators)) as executor:
+        futures = {
+            executor.submit(run, i, company): company
+            for i, company in enumerate(companies, 1)
+        }
+        for future in as_completed(futures):
+            company = futures.pop(future)
+            try:
+                ok, elapsed, tokens = future.result()
+            except Exception as e:
+                print(f"  {company} 失败: {e}")
+                ok, elapsed, tokens = False, None, None
+
+            if ok:
+                success_count += 1
+            else:
+                failed_companies.append(company)
+
+            results_log.write(json.dumps(
+                {"company": company, "success": ok, "time": elapsed, "tokens": tokens},
+                ensure_ascii=False
+            ) + "\n")
+            results_log.flush()
+
+    return success_count, failed_companies
+
+
+def prefetch_batch_generations(companies, orchestrator):
+    """
+    通过提供商批处理接口一次性提交所有公司的AI生成请求
+
+    结果写入响应缓存,随后的逐份报告生成直接命中缓存,不再调用实时API。
+    调用前需设置 LLM_CACHE=1,使批次中所有编排器的生成器启用同一缓存。
+    """
+    requests = []
+    for company in companies:
+        requests.extend(orchestrator.collect_ai_requests(company))
+
+    print(f"通过批处理接口提交 {len(requests)} 个生成请求,等待完成...")
+    fetched = orchestrator.ai_generator.prefetch_batch(requests)
+    usage = orchestrator.ai_generator.get_total_usage()
+    print(f"批处理完成: 缓存 {fetched} 条结果 (估算成本: ${usage.estimated_cost:.4f})")
+
+
+def generate_batch_reports(concurrency: int = None, use_batch_api: bool = False):
+    """批量生成所有公司的报告"""
     print("\n开始批量生成报告...")
     print("-" * 40)
 
-    extractor = DataExtractor("data")
+    extractor = DataExtractor("data", cache_dir=get_extract_cache_dir())
 
     # 获取所有公司
     try:
-        impact_data = extractor.extract_impact_mechanisms("影响评估机制_完整中文版.xlsx")
-        companies = list(set(item.company_name for item in impact_data if item.company_name))
+        companies = extractor.list_impact_company_names("影响评估机制_完整中文版.xlsx")
     except Exception as e:
         print(f"错误: 无法获取公司列表 - {e}")
         return
 
-    print(f"找到 {len(companies)} 个公司")
+    if concurrency is None:
+        concurrency = int(os.getenv("REPORT_CONCURRENCY", "5"))
+    concurrency = max(1, concurrency)
 
-    success_count = 0
-    failed_companies = []
+    print(f"找到 {len(companies)} 个公司 (并发数: {concurrency})")
+
+    if use_batch_api:
+        # 批处理结果通过响应缓存交付,需在创建生成器之前启用缓存
+        os.environ["LLM_CACHE"] = "1"
+
+    # 每个并发槽位一个编排器,在整个批次中复用
+    pool_size = max(1, min(concurrency, len(companies)))
+    orchestrators = [create_orchestrator() for _ in range(pool_size)]
 
-    for i, company in enumerate(companies, 1):
-        print(f"\n[{i}/{len(companies)}] 处理: {company}")
+    if use_batch_api:
         try:
-            if generate_single_report(company):
-                success_count += 1
-            else:
-                failed_companies.append(company)
+            prefetch_batch_generations(companies, orchestrators[0])
         except Exception as e:
-            print(f"  失败: {e}")
-            failed_companies.append(company)
+            # 批处理失败时回退到实时API逐个生成
+            print(f"警告: 批处理提交失败,改用实时API - {e}")
+
+    os.makedirs(os.path.dirname(BATCH_RESULTS_LOG), exist_ok=True)
+    with open(BATCH_RESULTS_LOG, "w", encoding="utf-8") as results_log:
+        success_count, failed_companies = _run_batch(companies, orchestrators, results_log)
 
     print("\n" + "=" * 40)
     print(f"批量生成完成:")
     print(f"  成功: {success_count}/{len(companies)}")
     if failed_companies:
         print(f"  失败: {', '.join(failed_companies)}")
+    print(f"  结果日志: {BATCH_RESULTS_LOG}")
 
 
 def main():
@@ -178,6 +298,8 @@ def main():
     python main.py --company EmergConnect          为 EmergConnect 生成报告
     python main.py --company EmergConnect -o out.docx  指定输出文件
     python main.py --batch                         批量生成所有公司报告
+    python main.py --batch -j 8                    批量生成,最多8个报告并发
+    python main.py --batch --batch-api             批量生成,AI内容走批处理接口
         """
     )
 
@@ -199,6 +321,19 @@ def main():
         help="批量生成所有公司的报告"
     )
 
+    parser.add_argument(
+        "--concurrency", "-j",
+        type=int,
+        default=None,
+        help="批量生成时的最大并发报告数 (默认: 环境变量 REPORT_CONCURRENCY 或 5)"
+    )
+
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="批量生成时通过 Message Batches / Batch API 提交AI请求 (半价,最长24小时)"
+    )
+
     parser.add_argument(
         "--list", "-l",
         action="store_true",
@@ -218,7 +353,7 @@ def main():
     if args.list:
         list_companies()
     elif args.batch:
-        generate_batch_reports()
+        generate_batch_reports(args.concurrency, args.batch_api)
     elif args.company:
         generate_single_report(args.company, args.output)
     else:
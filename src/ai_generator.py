@@ -6,24 +6,131 @@ This module provides AI-powered text generation with:
 - Error handling and retry mechanism
 - Grounding validation to prevent hallucinations
 - Token usage tracking and cost estimation
+- Optional response caching for repeated prompts
+- Provider-side prompt caching of the static instruction prefix
+- Offline batch submission (Message Batches / Batch API) for bulk runs
+- Streaming generation with early abort on ungrounded numbers
+- Context-window pre-check before sending oversized prompts
 
 根据 PROJECT_PLAN.md 第6节 "AI文本生成器" 和第10节 "Grounding验证" 实现。
 """
 
+import functools
+import json
 import logging
 import os
+import re
+import threading
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple
 from tenacity import (
+    before_sleep_log,
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
     retry_if_exception_type
 )
-from anthropic import Anthropic, APIError, RateLimitError, APITimeoutError
+from anthropic import (
+    Anthropic,
+    APIError,
+    RateLimitError,
+    APIConnectionError
+)
 from pydantic import BaseModel, Field
 
-from .models import GenerationResult, CitationInfo
+try:
+    import tiktoken  # 可选: OpenAI模型的精确本地Token计数
+except ImportError:
+    tiktoken = None
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+from .models import GenerationResult, CitationInfo, DATACLASS_SLOTS
+from .llm_cache import LLMCache
+
+
+# Prompt模板中的 {variable} 占位符
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+# 进程内同时进行的API调用上限,由所有生成器共享
+# (批量生成时报告并发数可以高于API并发数,多出的线程在此排队)
+# 首次调用API时才按 LLM_MAX_CONCURRENCY 创建,调用方可在导入后再加载 .env
+_api_slots: Optional[threading.BoundedSemaphore] = None
+_api_slots_lock = threading.Lock()
+
+
+def _get_api_slots() -> threading.BoundedSemaphore:
+    """返回进程级API并发槽位,首次调用时创建"""
+    global _api_slots
+    if _api_slots is None:
+        with _api_slots_lock:
+            if _api_slots is None:
+                _api_slots = threading.BoundedSemaphore(
+                    int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+                )
+    return _api_slots
+
+
+# 可重试的错误: 限流和连接/超时(APITimeoutError 是 APIConnectionError 的子类)
+_RATE_LIMIT_ERRORS: Tuple[type, ...] = (RateLimitError,)
+_CONNECTION_ERRORS: Tuple[type, ...] = (APIConnectionError,)
+if openai is not None:
+    _RATE_LIMIT_ERRORS += (openai.RateLimitError,)
+    _CONNECTION_ERRORS += (openai.APIConnectionError,)
+
+# 随机指数退避: 并发工作线程同时被限流时错开重试时间
+_BACKOFF = wait_random_exponential(min=1, max=30)
+
+
+def _retry_after_seconds(exc: Optional[BaseException]) -> Optional[float]:
+    """读取429响应中服务端建议的等待时间(retry-after-ms / retry-after 头)"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return float(retry_after_ms) / 1000
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            return float(retry_after)
+    except (TypeError, ValueError):
+        # HTTP-date 格式等无法解析时退回到指数退避
+        pass
+    return None
+
+
+def _wait_for_retry(retry_state) -> float:
+    """重试等待时间: 不短于服务端的 Retry-After,否则使用随机指数退避"""
+    delay = _BACKOFF(retry_state)
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+# Grounding验证时提取的数值
+_NUM_RE = re.compile(r"\b\d+\.?\d*\b")
+
+# 构建Prompt时匹配的字段: 任意不含花括号的键,未提供的键原样保留
+_FIELD_RE = re.compile(r"\{([^{}]+)\}")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_template(template: str) -> Tuple[str, ...]:
+    """
+    将Prompt模板预先拆分为片段,同一模板只解析一次
+
+    返回值按 (文本, 字段名, 文本, 字段名, ..., 文本) 交替排列,
+    偶数位为字面文本,奇数位为字段名。
+    """
+    return tuple(_FIELD_RE.split(template))
 
 
 # ==================== 配置模型 ====================
@@ -36,6 +143,10 @@ class APIConfig(BaseModel):
     max_tokens: int = Field(default=4000, description="最大输出tokens")
     temperature: float = Field(default=0.3, description="温度参数(0-1)")
     timeout: int = Field(default=60, description="超时时间(秒)")
+    context_window: Optional[int] = Field(
+        default=None,
+        description="模型上下文窗口(tokens),默认按模型名推断"
+    )
 
 
 class GroundingResult(BaseModel):
@@ -60,6 +171,80 @@ class TokenUsage(BaseModel):
     estimated_cost: float = Field(default=0.0, description="估算成本(美元)")
 
 
+@dataclass(**DATACLASS_SLOTS)
+class _UsageCounter:
+    """
+    内部Token统计
+
+    每次API调用和累计统计都使用该轻量结构,避免逐次Pydantic校验;
+    只在对外接口(get_total_usage)处转换为 TokenUsage。
+    """
+    input_tokens: int = 0
+    output_tokens: int = 0
+    estimated_cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: "_UsageCounter") -> None:
+        """累加另一份统计"""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.estimated_cost += other.estimated_cost
+
+    def as_dict(self) -> Dict[str, Any]:
+        """与 TokenUsage.model_dump() 相同结构的字典"""
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "estimated_cost": self.estimated_cost
+        }
+
+    def to_model(self) -> TokenUsage:
+        """转换为对外的 TokenUsage 模型"""
+        return TokenUsage(**self.as_dict())
+
+
+class TextStream:
+    """
+    流式生成结果
+
+    迭代得到生成的文本片段;迭代结束后 result 为与 generate_text
+    返回值结构相同的 GenerationResult。
+
+    流在迭代期间占用一个进程级API并发槽位。未迭代完就放弃时
+    必须调用 close()(或使用 with 语句),否则槽位要等到垃圾回收才释放。
+
+    使用示例:
+    ```python
+    with generator.generate_text_stream(template, data, source_data) as stream:
+        buffer = io.StringIO()
+        for chunk in stream:
+            buffer.write(chunk)
+    result = stream.result
+    ```
+    """
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self.result: Optional[GenerationResult] = None
+
+    def __iter__(self) -> Iterator[str]:
+        self.result = yield from self._chunks
+
+    def close(self) -> None:
+        """结束流并释放API连接和并发槽位(已迭代完时无操作)"""
+        self._chunks.close()
+
+    def __enter__(self) -> "TextStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 # ==================== AI文本生成器 ====================
 
 class AITextGenerator:
@@ -95,6 +280,20 @@ class AITextGenerator:
         "output": 0.015   # $15 per million output tokens
     }
 
+    # 批处理接口的价格折扣(两家提供商均为半价)
+    BATCH_DISCOUNT = 0.5
+
+    # 模型上下文窗口(tokens),按模型名前缀匹配,最长前缀优先
+    CONTEXT_WINDOWS = {
+        "claude": 200000,
+        "gpt-4o": 128000,
+        "gpt-4.1": 1047576,
+    }
+    DEFAULT_CONTEXT_WINDOW = 128000
+
+    # 缓存时抽象为槽位的实体字段(不同公司的相同结构Prompt可复用结果)
+    CACHE_SLOT_FIELDS = ("company_name",)
+
     def __init__(self, api_config: APIConfig):
         """
         初始化AI文本生成器
@@ -110,16 +309,17 @@ class AITextGenerator:
         
         if self.provider == "openai":
             # 初始化OpenAI客户端
-            from openai import OpenAI
+            if openai is None:
+                raise ImportError("OPENAI_API_KEY is set but the openai package is not installed")
             # 只在endpoint非空时使用base_url参数
             if api_config.endpoint:
-                self.client = OpenAI(
+                self.client = openai.OpenAI(
                     api_key=api_config.api_key,
                     base_url=api_config.endpoint
                 )
             else:
                 # 使用默认的OpenAI endpoint
-                self.client = OpenAI(api_key=api_config.api_key)
+                self.client = openai.OpenAI(api_key=api_config.api_key)
             self.logger.info(f"Using OpenAI API with model: {api_config.model_name}")
         else:
             # 初始化Anthropic客户端
@@ -134,8 +334,34 @@ class AITextGenerator:
                 self.client = Anthropic(api_key=api_config.api_key)
             self.logger.info(f"Using Claude API with model: {api_config.model_name}")
 
-        # Token使用统计
-        self.total_usage = TokenUsage()
+        # 提供商在初始化时确定,每次调用直接使用对应的实现
+        self._invoke = (
+            self._invoke_openai if self.provider == "openai" else self._invoke_claude
+        )
+
+        # Token使用统计(编排器会从多个线程并发生成,累加需加锁)
+        self.total_usage = _UsageCounter()
+        self._usage_lock = threading.Lock()
+
+        # 响应缓存(temperature=0 或设置 LLM_CACHE=1 时启用)
+        self.cache: Optional[LLMCache] = self._create_cache()
+
+    def _create_cache(self, force: bool = False) -> Optional[LLMCache]:
+        """
+        创建响应缓存
+
+        只有输出确定(temperature=0)或显式设置 LLM_CACHE=1 时才启用,
+        避免在需要多样化输出时返回重复内容。
+
+        Args:
+            force: 忽略上述条件强制启用(批处理结果通过缓存交付)
+        """
+        if not force and self.config.temperature != 0 and os.getenv("LLM_CACHE") != "1":
+            return None
+
+        cache_dir = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+        self.logger.info(f"LLM response cache enabled: {cache_dir}")
+        return LLMCache(cache_dir)
 
     def _detect_provider(self) -> str:
         """检测使用哪个API提供商"""
@@ -171,67 +397,211 @@ class AITextGenerator:
             prompt = self._build_prompt(prompt_template, data)
             self.logger.debug(f"Built prompt: {prompt[:200]}...")
 
-            # 2. 调用API生成文本
-            generated_text, usage = self._call_api(prompt)
+            # 2. 调用API生成文本(优先使用缓存)
+            generated_text, usage = self._cached_call(
+                prompt,
+                slots=self._entity_slots(data),
+                static_prefix=self._static_prefix(prompt_template)
+            )
             self.logger.info(
                 f"Generated {len(generated_text)} characters, "
                 f"used {usage.total_tokens} tokens"
             )
 
-            # 3. Grounding验证
-            grounding_result = None
-            validation_errors = []
+            return self._finalize_generation(
+                generated_text,
+                usage,
+                source_data,
+                validate_grounding
+            )
 
-            if validate_grounding and source_data:
-                grounding_result = self.validate_grounding(
-                    generated_text,
-                    source_data
-                )
+        except Exception as e:
+            self.logger.error(f"Text generation failed: {str(e)}", exc_info=True)
+            return GenerationResult(
+                success=False,
+                validation_errors=[f"Generation error: {str(e)}"]
+            )
 
-                if not grounding_result.is_grounded:
-                    validation_errors.append(
-                        f"Grounding validation failed: "
-                        f"{len(grounding_result.hallucinations)} hallucinations detected"
-                    )
-                    self.logger.warning(
-                        f"Hallucinations detected: {grounding_result.hallucinations}"
+    def generate_text_stream(
+        self,
+        prompt_template: str,
+        data: Dict[str, Any],
+        source_data: Optional[Dict[str, Any]] = None,
+        validate_grounding: bool = True,
+        abort_on_hallucination: bool = False
+    ) -> TextStream:
+        """
+        流式生成自然语言文本
+
+        片段在API返回时立即产出,调用方可以边接收边处理。
+        abort_on_hallucination=True 时,一旦已完整输出的数值不在源数据中
+        即关闭流,不再为后续输出付费(结果标记为验证失败,且不写入缓存)。
+
+        Args:
+            prompt_template: Prompt模板(支持 {variable} 占位符)
+            data: 填充数据
+            source_data: 源数据(用于grounding验证)
+            validate_grounding: 是否进行grounding验证
+            abort_on_hallucination: 检测到未在源数据中的数值时提前终止
+
+        Returns:
+            TextStream: 可迭代的文本片段,迭代结束后提供 result
+        """
+        return TextStream(self._stream_generation(
+            prompt_template,
+            data,
+            source_data,
+            validate_grounding,
+            abort_on_hallucination
+        ))
+
+    def _stream_generation(
+        self,
+        prompt_template: str,
+        data: Dict[str, Any],
+        source_data: Optional[Dict[str, Any]],
+        validate_grounding: bool,
+        abort_on_hallucination: bool
+    ):
+        """generate_text_stream 的生成器实现,返回值为 GenerationResult"""
+        try:
+            prompt = self._build_prompt(prompt_template, data)
+            slots = self._entity_slots(data)
+
+            key = None
+            if self.cache is not None:
+                key = self._cache_key(prompt, slots)
+                hit = self.cache.get(key)
+                if hit is not None:
+                    self.logger.debug(f"LLM cache hit: {key[:12]}")
+                    generated_text = LLMCache.fill_slots(hit[0], slots)
+                    yield generated_text
+                    return self._finalize_generation(
+                        generated_text, _UsageCounter(), source_data, validate_grounding
                     )
 
-            # 4. 构建可追溯性信息
-            traceability_map = self._build_traceability(
-                generated_text,
-                source_data or {}
+            source_numbers = None
+            if abort_on_hallucination and source_data:
+                source_numbers = self._source_numbers(source_data)
+
+            self._check_context_window(prompt, self._static_prefix(prompt_template))
+
+            parts: List[str] = []
+            usage_out: List[_UsageCounter] = []
+            ungrounded = None
+            # 尚未检查的尾部文本; checked 之前只保留一个已检查字符,供 \b 判断边界
+            pending = ""
+            checked = 0
+
+            chunks = self._call_api_stream(
+                prompt,
+                self._static_prefix(prompt_template),
+                usage_out
             )
+            try:
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield chunk
+
+                    if source_numbers is None:
+                        continue
+
+                    # 只检查已完整输出的数值(末尾可能是被截断的数字)
+                    pending += chunk
+                    complete = len(pending.rstrip("0123456789."))
+                    for match in _NUM_RE.finditer(pending, checked, complete):
+                        if self._normalize_number(match.group()) not in source_numbers:
+                            ungrounded = match.group()
+                            break
+                    if complete > checked:
+                        pending = pending[complete - 1:]
+                        checked = 1
+
+                    if ungrounded is not None:
+                        self.logger.warning(
+                            f"Aborting stream: numerical value '{ungrounded}' not in source data"
+                        )
+                        break
+            finally:
+                # 提前终止或调用方关闭流时立即结束API请求,释放并发槽位
+                chunks.close()
 
-            # 5. 更新总Token统计
-            self.total_usage.input_tokens += usage.input_tokens
-            self.total_usage.output_tokens += usage.output_tokens
-            self.total_usage.total_tokens += usage.total_tokens
-            self.total_usage.estimated_cost += usage.estimated_cost
+            generated_text = "".join(parts)
+            usage = usage_out[0] if usage_out else _UsageCounter()
 
-            # 6. 返回结果
-            return GenerationResult(
-                success=True,
-                output_path=None,  # 文本内容,不是文件路径
-                validation_errors=validation_errors,
-                traceability_map=traceability_map,
-                metrics={
-                    "generated_text": generated_text,
-                    "token_usage": usage.model_dump(),
-                    "grounding_result": (
-                        grounding_result.model_dump() if grounding_result else None
-                    ),
-                    "total_usage": self.total_usage.model_dump()
-                }
+            if key is not None and ungrounded is None and not self._is_truncated(usage):
+                self._store_in_cache(key, generated_text, slots, usage)
+
+            result = self._finalize_generation(
+                generated_text, usage, source_data, validate_grounding
             )
+            if ungrounded is not None:
+                result.validation_errors.insert(
+                    0,
+                    f"Generation aborted: numerical value '{ungrounded}' not found in source data"
+                )
+            return result
 
         except Exception as e:
-            self.logger.error(f"Text generation failed: {str(e)}", exc_info=True)
+            self.logger.error(f"Streaming generation failed: {str(e)}", exc_info=True)
             return GenerationResult(
                 success=False,
                 validation_errors=[f"Generation error: {str(e)}"]
             )
 
+    def _finalize_generation(
+        self,
+        generated_text: str,
+        usage: _UsageCounter,
+        source_data: Optional[Dict[str, Any]],
+        validate_grounding: bool
+    ) -> GenerationResult:
+        """Grounding验证、构建可追溯性、累计Token统计并组装生成结果"""
+        # 3. Grounding验证
+        grounding_result = None
+        validation_errors = []
+
+        if validate_grounding and source_data:
+            grounding_result = self.validate_grounding(
+                generated_text,
+                source_data
+            )
+
+            if not grounding_result.is_grounded:
+                validation_errors.append(
+                    f"Grounding validation failed: "
+                    f"{len(grounding_result.hallucinations)} hallucinations detected"
+                )
+                self.logger.warning(
+                    f"Hallucinations detected: {grounding_result.hallucinations}"
+                )
+
+        # 4. 构建可追溯性信息
+        traceability_map = self._build_traceability(
+            generated_text,
+            source_data or {}
+        )
+
+        # 5. 更新总Token统计
+        with self._usage_lock:
+            self.total_usage.add(usage)
+
+        # 6. 返回结果
+        return GenerationResult(
+            success=True,
+            output_path=None,  # 文本内容,不是文件路径
+            validation_errors=validation_errors,
+            traceability_map=traceability_map,
+            metrics={
+                "generated_text": generated_text,
+                "token_usage": usage.as_dict(),
+                "grounding_result": (
+                    grounding_result.model_dump() if grounding_result else None
+                ),
+                "total_usage": self.total_usage.as_dict()
+            }
+        )
+
     def _build_prompt(
         self,
         template: str,
@@ -250,121 +620,338 @@ class AITextGenerator:
             str: 填充后的Prompt
         """
         try:
-            # 简单占位符替换
-            prompt = template
+            # 模板片段已预先拆分,每次只需按字段取值拼接;
+            # 未提供的占位符和字面花括号保持原样
+            parts = list(_compile_template(template))
+            for i in range(1, len(parts), 2):
+                key = parts[i]
+                parts[i] = str(data[key]) if key in data else "{" + key + "}"
 
-            for key, value in data.items():
-                placeholder = "{" + key + "}"
-                if placeholder in prompt:
-                    # 处理不同类型的值
-                    if isinstance(value, (list, dict)):
-                        value_str = str(value)
-                    else:
-                        value_str = str(value)
-
-                    prompt = prompt.replace(placeholder, value_str)
-
-            return prompt
+            return "".join(parts)
 
         except Exception as e:
             self.logger.error(f"Prompt building failed: {str(e)}")
             raise ValueError(f"Failed to build prompt: {str(e)}")
 
+    def _entity_slots(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """提取用于缓存槽位抽象的实体值"""
+        return {
+            field: data[field]
+            for field in self.CACHE_SLOT_FIELDS
+            if isinstance(data.get(field), str) and data[field]
+        }
+
+    def _cached_call(
+        self,
+        prompt: str,
+        slots: Optional[Dict[str, str]] = None,
+        static_prefix: str = ""
+    ) -> Tuple[str, _UsageCounter]:
+        """
+        带缓存的API调用
+
+        缓存键基于槽位抽象后的Prompt: 仅实体值(如公司名)不同的Prompt
+        命中同一条缓存,返回时回填当前实体值。其余内容必须完全一致,
+        因此不会把一家公司的数据带入另一家公司的报告。
+
+        命中缓存时Token统计记为0(未产生实际费用)。
+
+        Args:
+            prompt: Prompt文本
+            slots: 槽位名 -> 实体值
+            static_prefix: Prompt中与数据无关的静态前缀
+
+        Returns:
+            Tuple[str, _UsageCounter]: (生成的文本, Token使用统计)
+        """
+        if self.cache is None:
+            self._check_context_window(prompt, static_prefix)
+            return self._call_api(prompt, static_prefix)
+
+        slots = slots or {}
+        key = self._cache_key(prompt, slots)
+
+        hit = self.cache.get(key)
+        if hit is not None:
+            self.logger.info("LLM cache hit, skipping API call")
+            return LLMCache.fill_slots(hit[0], slots), _UsageCounter()
+
+        self._check_context_window(prompt, static_prefix)
+        generated_text, usage = self._call_api(prompt, static_prefix)
+
+        if self._is_truncated(usage):
+            # 被max_tokens截断的输出不缓存,调大max_tokens后可重新生成
+            self.logger.warning("Response hit max_tokens, not caching truncated output")
+        else:
+            self._store_in_cache(key, generated_text, slots, usage)
+        return generated_text, usage
+
+    def _store_in_cache(
+        self,
+        key: str,
+        generated_text: str,
+        slots: Dict[str, str],
+        usage: _UsageCounter
+    ) -> bool:
+        """按槽位抽象后写入缓存; 实体值嵌在更长的词中、无法安全抽象时不缓存"""
+        abstracted = LLMCache.abstract_response(generated_text, slots)
+        if abstracted is None:
+            self.logger.warning("Response embeds an entity value in a longer word, not caching")
+            return False
+
+        self.cache.set(key, abstracted, usage.as_dict())
+        return True
+
+    def _context_window(self) -> int:
+        """当前模型的上下文窗口大小"""
+        if self.config.context_window:
+            return self.config.context_window
+
+        model = self.config.model_name.lower()
+        for prefix in sorted(self.CONTEXT_WINDOWS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return self.CONTEXT_WINDOWS[prefix]
+        return self.DEFAULT_CONTEXT_WINDOW
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """
+        粗略估算Token数(偏高估计,不调用API)
+
+        CJK字符按每字1个token,其余按每3个字符1个token计。
+        """
+        cjk = sum(1 for ch in text if ch >= "\u2e80")
+        return cjk + (len(text) - cjk + 2) // 3
+
+    def _count_tokens(self, system_prefix: str, user_content: str) -> Optional[int]:
+        """
+        精确计算输入Token数
+
+        Claude使用 count_tokens 接口(免费,不产生生成费用);
+        OpenAI在安装了tiktoken时本地计算。无法精确计算时返回None。
+        """
+        if self.provider == "openai":
+            if tiktoken is None:
+                return None
+            try:
+                encoding = tiktoken.encoding_for_model(self.config.model_name)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+            return len(encoding.encode(system_prefix + user_content))
+
+        request = self._claude_request(system_prefix, user_content)
+        response = self.client.messages.count_tokens(
+            model=request["model"],
+            messages=request["messages"],
+            **({"system": request["system"]} if "system" in request else {})
+        )
+        return response.input_tokens
+
+    def _check_context_window(self, prompt: str, static_prefix: str = "") -> None:
+        """
+        在调用API前检查Prompt是否超出上下文窗口
+
+        先用本地估算快速放行明显未超限的Prompt(绝大多数情况,无额外开销);
+        只有估算接近上限时才进行精确计数,确认超限则直接报错,
+        避免一次注定失败的网络往返和重试。
+
+        Raises:
+            ValueError: 输入Token数加max_tokens超出上下文窗口
+        """
+        budget = self._context_window() - self.config.max_tokens
+        if self._estimate_tokens(prompt) <= budget:
+            return
+
+        system_prefix, user_content = self._split_prompt(prompt, static_prefix)
+        input_tokens = self._count_tokens(system_prefix, user_content)
+        if input_tokens is None:
+            self.logger.warning("Prompt may exceed the context window; token count unavailable")
+            return
+
+        if input_tokens > budget:
+            raise ValueError(
+                f"Prompt too long: {input_tokens} input tokens + max_tokens "
+                f"{self.config.max_tokens} exceeds the {self._context_window()}-token "
+                f"context window of {self.config.model_name}. "
+                f"Shorten the source data in the prompt or lower max_tokens."
+            )
+
+    def _is_truncated(self, usage: _UsageCounter) -> bool:
+        """输出是否达到max_tokens上限(可能被截断)"""
+        return usage.output_tokens >= self.config.max_tokens
+
+    def _cache_key(self, prompt: str, slots: Dict[str, str]) -> str:
+        """计算槽位抽象后Prompt的缓存键"""
+        return LLMCache.make_key(
+            self.config.model_name,
+            LLMCache.abstract_slots(prompt, slots),
+            self.config.temperature,
+            self.config.max_tokens
+        )
+
+    @staticmethod
+    def _static_prefix(template: str) -> str:
+        """
+        提取Prompt模板的静态前缀
+
+        静态前缀为第一个占位符所在行之前的全部内容,所有公司共享,
+        适合作为提供商侧的Prompt缓存块。截断到行首可避免把"公司："
+        这类字段标签与其数据值拆开。
+
+        Args:
+            template: Prompt模板
+
+        Returns:
+            str: 静态前缀(无可用前缀时为空字符串)
+        """
+        match = _PLACEHOLDER_RE.search(template)
+        if not match:
+            return ""
+
+        line_start = template.rfind("\n", 0, match.start())
+        return template[:line_start + 1] if line_start >= 0 else ""
+
+    @staticmethod
+    def _split_prompt(prompt: str, static_prefix: str) -> Tuple[str, str]:
+        """
+        将Prompt拆分为 (静态指令, 动态内容)
+
+        仅当前缀确实出现在Prompt开头且两部分均非空时拆分,
+        否则整段Prompt作为用户消息发送。
+        """
+        if (
+            static_prefix.strip()
+            and prompt.startswith(static_prefix)
+            and prompt[len(static_prefix):].strip()
+        ):
+            return static_prefix, prompt[len(static_prefix):]
+        return "", prompt
+
+    def _openai_request(self, system_prefix: str, user_content: str) -> Dict[str, Any]:
+        """构建OpenAI chat.completions 请求参数"""
+        messages = [{"role": "user", "content": user_content}]
+        if system_prefix:
+            messages.insert(0, {"role": "system", "content": system_prefix})
+
+        return {
+            "model": self.config.model_name,
+            "messages": messages,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature
+        }
+
+    def _claude_request(self, system_prefix: str, user_content: str) -> Dict[str, Any]:
+        """构建Claude messages 请求参数"""
+        request = {
+            "model": self.config.model_name,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": user_content
+                }
+            ]
+        }
+        if system_prefix:
+            # 静态指令标记为可缓存,重复调用时不再重新处理这部分输入
+            request["system"] = [
+                {
+                    "type": "text",
+                    "text": system_prefix,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ]
+        return request
+
+    def _make_usage(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        discount: float = 1.0
+    ) -> _UsageCounter:
+        """根据Token数计算使用统计和估算成本(使用Claude定价作为默认)"""
+        estimated_cost = (
+            (input_tokens / 1000) * self.PRICING["input"] +
+            (output_tokens / 1000) * self.PRICING["output"]
+        ) * discount
+
+        return _UsageCounter(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            estimated_cost=estimated_cost
+        )
+
+    def _invoke_openai(self, system_prefix: str, user_content: str) -> Tuple[str, int, int]:
+        """调用OpenAI chat.completions,返回 (生成的文本, 输入tokens, 输出tokens)"""
+        response = self.client.chat.completions.create(
+            **self._openai_request(system_prefix, user_content)
+        )
+        return (
+            response.choices[0].message.content,
+            response.usage.prompt_tokens,
+            response.usage.completion_tokens
+        )
+
+    def _invoke_claude(self, system_prefix: str, user_content: str) -> Tuple[str, int, int]:
+        """调用Claude messages,返回 (生成的文本, 输入tokens, 输出tokens)"""
+        response = self.client.messages.create(
+            **self._claude_request(system_prefix, user_content)
+        )
+        generated_text = response.content[0].text if response.content else ""
+        return generated_text, response.usage.input_tokens, response.usage.output_tokens
+
     @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((RateLimitError, APITimeoutError))
+        stop=stop_after_attempt(5),
+        wait=_wait_for_retry,
+        retry=retry_if_exception_type(_RATE_LIMIT_ERRORS + _CONNECTION_ERRORS),
+        before_sleep=before_sleep_log(logging.getLogger(__name__), logging.WARNING),
+        reraise=True
     )
-    def _call_api(self, prompt: str) -> Tuple[str, TokenUsage]:
+    def _call_api(self, prompt: str, static_prefix: str = "") -> Tuple[str, _UsageCounter]:
         """
         调用AI API (支持Claude和OpenAI)
 
-        实现指数退避重试机制:
-        - 最多重试3次
-        - 等待时间: 4秒, 8秒, 10秒(最大)
-        - 仅对限流和超时错误重试
+        实现退避重试机制:
+        - 最多尝试5次
+        - 随机指数退避(1-30秒),服务端返回 Retry-After 时至少等待该时长
+        - 仅对限流、超时和连接错误重试(Claude和OpenAI)
+
+        请求期间占用一个进程级API并发槽位(LLM_MAX_CONCURRENCY),
+        退避等待时不占用。
+
+        静态前缀作为system指令单独发送: Claude标记 cache_control 启用
+        Prompt缓存,OpenAI则依靠固定的system消息触发自动前缀缓存。
 
         Args:
             prompt: Prompt文本
+            static_prefix: 所有调用共享的静态指令前缀
 
         Returns:
-            Tuple[str, TokenUsage]: (生成的文本, Token使用统计)
+            Tuple[str, _UsageCounter]: (生成的文本, Token使用统计)
 
         Raises:
             APIError: API调用失败
         """
         try:
             start_time = time.time()
+            system_prefix, user_content = self._split_prompt(prompt, static_prefix)
 
-            if self.provider == "openai":
-                # 调用OpenAI API (使用chat.completions.create)
-                response = self.client.chat.completions.create(
-                    model=self.config.model_name,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=self.config.max_tokens,
-                    temperature=self.config.temperature
+            with _get_api_slots():
+                generated_text, input_tokens, output_tokens = self._invoke(
+                    system_prefix, user_content
                 )
-                
-                elapsed_time = time.time() - start_time
-                self.logger.debug(f"OpenAI API call completed in {elapsed_time:.2f}s")
-                
-                # 提取生成的文本
-                generated_text = response.choices[0].message.content
-                
-                # OpenAI的token使用
-                input_tokens = response.usage.prompt_tokens
-                output_tokens = response.usage.completion_tokens
-                
-            else:
-                # 调用Claude API
-                response = self.client.messages.create(
-                    model=self.config.model_name,
-                    max_tokens=self.config.max_tokens,
-                    temperature=self.config.temperature,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                )
-
-                elapsed_time = time.time() - start_time
-                self.logger.debug(f"Claude API call completed in {elapsed_time:.2f}s")
-
-                # 提取生成的文本
-                generated_text = ""
-                if response.content and len(response.content) > 0:
-                    generated_text = response.content[0].text
-
-                # 计算Token使用
-                input_tokens = response.usage.input_tokens
-                output_tokens = response.usage.output_tokens
 
-            total_tokens = input_tokens + output_tokens
-
-            # 计算成本（使用Claude定价作为默认）
-            estimated_cost = (
-                (input_tokens / 1000) * self.PRICING["input"] +
-                (output_tokens / 1000) * self.PRICING["output"]
-            )
-
-            usage = TokenUsage(
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                total_tokens=total_tokens,
-                estimated_cost=estimated_cost
-            )
+            elapsed_time = time.time() - start_time
+            self.logger.debug(f"{self.provider} API call completed in {elapsed_time:.2f}s")
 
-            return generated_text, usage
+            return generated_text, self._make_usage(input_tokens, output_tokens)
 
-        except RateLimitError as e:
+        except _RATE_LIMIT_ERRORS as e:
             self.logger.warning(f"Rate limit hit, will retry: {str(e)}")
             raise
-        except APITimeoutError as e:
-            self.logger.warning(f"API timeout, will retry: {str(e)}")
+        except _CONNECTION_ERRORS as e:
+            self.logger.warning(f"API timeout or connection error, will retry: {str(e)}")
             raise
         except APIError as e:
             self.logger.error(f"API error: {str(e)}")
@@ -373,10 +960,280 @@ class AITextGenerator:
             self.logger.error(f"Unexpected error: {str(e)}")
             raise ValueError(f"API call failed: {str(e)}")
 
+    def _call_api_stream(
+        self,
+        prompt: str,
+        static_prefix: str,
+        usage_out: List[_UsageCounter]
+    ) -> Iterator[str]:
+        """
+        流式调用AI API,逐片段产出生成的文本
+
+        与 _call_api 不同,流式调用不做自动重试(已产出的片段无法撤回)。
+        生成器结束或被关闭时,将Token统计追加到 usage_out;
+        提前关闭时仅包含已收到的统计事件。
+
+        Args:
+            prompt: Prompt文本
+            static_prefix: 所有调用共享的静态指令前缀
+            usage_out: 接收Token统计的列表
+
+        Yields:
+            str: 文本片段
+
+        Raises:
+            ValueError: API调用失败
+        """
+        system_prefix, user_content = self._split_prompt(prompt, static_prefix)
+        input_tokens = 0
+        output_tokens = 0
+
+        try:
+            with _get_api_slots():
+                if self.provider == "openai":
+                    response = self.client.chat.completions.create(
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **self._openai_request(system_prefix, user_content)
+                    )
+                    try:
+                        for chunk in response:
+                            if chunk.usage:
+                                input_tokens = chunk.usage.prompt_tokens
+                                output_tokens = chunk.usage.completion_tokens
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                yield chunk.choices[0].delta.content
+                    finally:
+                        response.close()
+
+                else:
+                    with self.client.messages.stream(
+                        **self._claude_request(system_prefix, user_content)
+                    ) as stream:
+                        for event in stream:
+                            if event.type == "text":
+                                yield event.text
+                            elif event.type == "message_start":
+                                input_tokens = event.message.usage.input_tokens
+                            elif event.type == "message_delta":
+                                # output_tokens 为累计值
+                                output_tokens = event.usage.output_tokens
+
+        except APIError as e:
+            self.logger.error(f"API error: {str(e)}")
+            raise ValueError(f"API call failed: {str(e)}")
+
+        finally:
+            usage_out.append(self._make_usage(input_tokens, output_tokens))
+
+    def prefetch_batch(
+        self,
+        requests: List[Tuple[str, Dict[str, Any]]],
+        poll_interval: float = 30.0
+    ) -> int:
+        """
+        通过提供商的批处理接口一次性提交多个生成请求
+
+        批处理在服务端异步执行(最长24小时),价格为实时接口的一半。
+        结果写入响应缓存,之后正常调用 generate_text 时直接命中缓存,
+        因此报告组装流程无需任何改动。已在缓存中的请求不会重复提交。
+
+        Args:
+            requests: (Prompt模板, 填充数据) 列表
+            poll_interval: 轮询批处理状态的间隔(秒)
+
+        Returns:
+            int: 本次写入缓存的结果数量(被max_tokens截断或无法按槽位抽象的结果不计入)
+        """
+        if self.cache is None:
+            self.cache = self._create_cache(force=True)
+
+        # custom_id -> (缓存键, 槽位, 静态前缀, 用户内容)
+        pending: Dict[str, Tuple[str, Dict[str, str], str, str]] = {}
+        seen_keys = set()
+
+        for prompt_template, data in requests:
+            prompt = self._build_prompt(prompt_template, data)
+            slots = self._entity_slots(data)
+            key = self._cache_key(prompt, slots)
+
+            if key in seen_keys or self.cache.get(key) is not None:
+                continue
+            seen_keys.add(key)
+
+            system_prefix, user_content = self._split_prompt(
+                prompt,
+                self._static_prefix(prompt_template)
+            )
+            pending[f"req-{len(pending)}"] = (key, slots, system_prefix, user_content)
+
+        if not pending:
+            self.logger.info("All batch requests already cached, nothing to submit")
+            return 0
+
+        self.logger.info(f"Submitting {len(pending)} requests via {self.provider} batch API")
+
+        if self.provider == "openai":
+            results = self._run_openai_batch(pending, poll_interval)
+        else:
+            results = self._run_claude_batch(pending, poll_interval)
+
+        cached = 0
+        for custom_id, (generated_text, usage) in results.items():
+            key, slots, _, _ = pending[custom_id]
+
+            # 批处理结果已计费,无论是否写入缓存都计入统计
+            with self._usage_lock:
+                self.total_usage.add(usage)
+
+            if self._is_truncated(usage):
+                # 与实时调用一致: 被max_tokens截断的输出不缓存,生成报告时重新调用
+                self.logger.warning(
+                    f"Batch result {custom_id} hit max_tokens, not caching truncated output"
+                )
+                continue
+
+            if self._store_in_cache(key, generated_text, slots, usage):
+                cached += 1
+
+        failed = len(pending) - len(results)
+        if failed:
+            self.logger.warning(f"{failed} batch requests failed and will use the live API")
+
+        return cached
+
+    def _run_claude_batch(
+        self,
+        pending: Dict[str, Tuple[str, Dict[str, str], str, str]],
+        poll_interval: float
+    ) -> Dict[str, Tuple[str, _UsageCounter]]:
+        """提交Claude Message Batch并等待结果"""
+        batch = self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": self._claude_request(system_prefix, user_content)
+                }
+                for custom_id, (_, _, system_prefix, user_content) in pending.items()
+            ]
+        )
+
+        while batch.processing_status != "ended":
+            self.logger.debug(f"Batch {batch.id} status: {batch.processing_status}")
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        results: Dict[str, Tuple[str, _UsageCounter]] = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                self.logger.warning(f"Batch request {entry.custom_id}: {entry.result.type}")
+                continue
+
+            message = entry.result.message
+            generated_text = message.content[0].text if message.content else ""
+            results[entry.custom_id] = (
+                generated_text,
+                self._make_usage(
+                    message.usage.input_tokens,
+                    message.usage.output_tokens,
+                    discount=self.BATCH_DISCOUNT
+                )
+            )
+
+        return results
+
+    def _run_openai_batch(
+        self,
+        pending: Dict[str, Tuple[str, Dict[str, str], str, str]],
+        poll_interval: float
+    ) -> Dict[str, Tuple[str, _UsageCounter]]:
+        """上传JSONL并提交OpenAI Batch,等待结果"""
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._openai_request(system_prefix, user_content)
+                },
+                ensure_ascii=False
+            )
+            for custom_id, (_, _, system_prefix, user_content) in pending.items()
+        ]
+
+        input_file = self.client.files.create(
+            file=("batch_requests.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            self.logger.debug(f"Batch {batch.id} status: {batch.status}")
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise ValueError(f"Batch {batch.id} did not complete: {batch.status}")
+
+        results: Dict[str, Tuple[str, _UsageCounter]] = {}
+        output = self.client.files.content(batch.output_file_id).text
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                self.logger.warning(f"Batch request {item.get('custom_id')} failed: {item.get('error')}")
+                continue
+
+            body = response["body"]
+            results[item["custom_id"]] = (
+                body["choices"][0]["message"]["content"] or "",
+                self._make_usage(
+                    body["usage"]["prompt_tokens"],
+                    body["usage"]["completion_tokens"],
+                    discount=self.BATCH_DISCOUNT
+                )
+            )
+
+        return results
+
+    def validate_grounding_batch(
+        self,
+        generated_texts: List[str],
+        source_data: Dict[str, Any]
+    ) -> List[GroundingResult]:
+        """
+        用同一份源数据验证多段生成内容
+
+        源数据只序列化和提取数值一次,之后每段文本只需一次正则扫描
+        加集合查找,总耗时与源数据和全部文本的长度之和成线性关系。
+
+        Args:
+            generated_texts: 生成的文本列表
+            source_data: 共享的源数据
+
+        Returns:
+            List[GroundingResult]: 与输入顺序一致的验证结果
+        """
+        source_numbers = self._source_numbers(source_data) if source_data else set()
+
+        return [
+            self.validate_grounding(text, source_data, source_numbers=source_numbers)
+            for text in generated_texts
+        ]
+
     def validate_grounding(
         self,
         generated_text: str,
-        source_data: Dict[str, Any]
+        source_data: Dict[str, Any],
+        source_numbers: Optional[Set[str]] = None
     ) -> GroundingResult:
         """
         验证生成内容是否基于提供的源数据(Grounding验证)
@@ -389,6 +1246,7 @@ class AITextGenerator:
         Args:
             generated_text: 生成的文本
             source_data: 源数据
+            source_numbers: 预先提取的源数据数值集合(可选,批量验证时复用)
 
         Returns:
             GroundingResult: 验证结果
@@ -411,15 +1269,15 @@ class AITextGenerator:
 
             # 3. 基本的幻觉检测
             # 检查是否包含未提供的具体数字(简单启发式)
-            import re
-            numbers_in_text = re.findall(r'\b\d+\.?\d*\b', generated_text)
+            numbers_in_text = _NUM_RE.findall(generated_text)
 
             if len(numbers_in_text) > 0 and source_data:
-                # 检查这些数字是否在源数据中
-                source_data_str = str(source_data).lower()
+                # 源数据中的数值一次性提取为集合,逐个数值O(1)查找
+                if source_numbers is None:
+                    source_numbers = self._source_numbers(source_data)
 
                 for num in numbers_in_text:
-                    if num not in source_data_str:
+                    if self._normalize_number(num) not in source_numbers:
                         # 可能是幻觉数字
                         hallucinations.append(
                             f"Numerical value '{num}' not found in source data"
@@ -448,6 +1306,21 @@ class AITextGenerator:
                 details=str(e)
             )
 
+    @classmethod
+    def _source_numbers(cls, source_data: Dict[str, Any]) -> Set[str]:
+        """提取源数据中出现的全部数值(规范化后)"""
+        return {
+            cls._normalize_number(num)
+            for num in _NUM_RE.findall(str(source_data))
+        }
+
+    @staticmethod
+    def _normalize_number(num: str) -> str:
+        """规范化数值字符串,使 "100"、"100." 和 "100.0" 视为同一数值"""
+        if "." in num:
+            num = num.rstrip("0").rstrip(".")
+        return num or "0"
+
     def _build_traceability(
         self,
         generated_text: str,
@@ -496,11 +1369,22 @@ class AITextGenerator:
         Returns:
             TokenUsage: 累计Token使用情况
         """
-        return self.total_usage
+        return self.total_usage.to_model()
+
+    def get_total_usage_dict(self) -> Dict[str, Any]:
+        """
+        获取总Token使用统计的字典形式(与 get_total_usage().model_dump() 结构相同)
+
+        供只需要字典的调用方(如报告指标)使用,省去构建和序列化 TokenUsage 模型。
+
+        Returns:
+            Dict[str, Any]: input_tokens, output_tokens, total_tokens, estimated_cost
+        """
+        return self.total_usage.as_dict()
 
     def reset_usage(self):
         """重置Token使用统计"""
-        self.total_usage = TokenUsage()
+        self.total_usage = _UsageCounter()
         self.logger.info("Token usage statistics reset")
 
 
@@ -563,6 +1447,7 @@ __all__ = [
     'AITextGenerator',
     'APIConfig',
     'GroundingResult',
+    'TextStream',
     'TokenUsage',
     'create_generator_from_config'
 ]
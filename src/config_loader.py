@@ -7,11 +7,18 @@ This module loads and parses the template mapping YAML configuration file.
 
 import logging
 import os
+import string
+import threading
+from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 import yaml
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
+
+# 优先使用libyaml的C解析器,未编译libyaml时回退到纯Python实现(语义相同)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 # ==================== 配置模型 ====================
@@ -109,6 +116,14 @@ class OutputSettings(BaseModel):
 
 # ==================== 配置加载器 ====================
 
+# TemplateConfig.load 的进程内缓存: (绝对路径, mtime_ns, 文件大小) -> 已解析的配置
+_config_cache: Dict[Tuple[str, int, int], "TemplateConfig"] = {}
+_config_cache_lock = threading.Lock()
+
+# 整个规则列表一次校验,核心 schema 只构建一次
+_INSERT_RULES_ADAPTER = TypeAdapter(List[InsertRule])
+
+
 class TemplateConfig:
     """
     模板配置加载器
@@ -120,17 +135,23 @@ class TemplateConfig:
     config = TemplateConfig("config/template_mapping.yaml")
     rules = config.get_insert_rules()
     template_path = config.get_template_path()
+
+    # 重复加载同一文件时复用已解析的实例
+    config = TemplateConfig.load("config/template_mapping.yaml")
     ```
     """
 
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, validate: bool = True):
         """
         初始化配置加载器
 
         Args:
             config_path: YAML配置文件路径
+            validate: 是否对插入规则做完整的Pydantic校验。
+                已确认有效的配置可传 False,直接构建模型以跳过逐字段校验
         """
         self.config_path = config_path
+        self.validate = validate
         self.logger = logging.getLogger(__name__)
         self._raw_config: Dict[str, Any] = {}
 
@@ -140,16 +161,55 @@ class TemplateConfig:
         # 解析配置
         self.template_info: TemplateInfo
         self.insert_rules: List[InsertRule] = []
+        self._rules_by_name: Dict[str, InsertRule] = {}
+        self._filename_tokens: Optional[List[Tuple[str, Optional[str], str]]] = None
         self.validation: ValidationSettings
         self.output: OutputSettings
 
         self._parse_config()
 
+        # 默认基础目录: 配置文件所在目录的父目录
+        self._default_base_dir = Path(config_path).parent.parent
+
         self.logger.info(
             f"Loaded template configuration from {config_path} "
             f"with {len(self.insert_rules)} insert rules"
         )
 
+    @classmethod
+    def load(cls, config_path: str) -> "TemplateConfig":
+        """
+        加载配置,文件未变化时返回已缓存的实例
+
+        缓存键包含文件的修改时间和大小,文件被编辑后自动重新解析。
+        返回的实例在调用方之间共享,应视为只读。
+
+        Args:
+            config_path: YAML配置文件路径
+
+        Returns:
+            TemplateConfig: 配置实例
+        """
+        try:
+            stat = os.stat(config_path)
+        except OSError:
+            # 文件不存在等情况交给构造函数报告统一的错误
+            return cls(config_path)
+
+        key = (os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+        with _config_cache_lock:
+            cached = _config_cache.get(key)
+        if cached is not None:
+            return cached
+
+        config = cls(config_path)
+        with _config_cache_lock:
+            # 同一路径只保留最新版本
+            for stale in [k for k in _config_cache if k[0] == key[0]]:
+                del _config_cache[stale]
+            _config_cache[key] = config
+        return config
+
     def _load_config(self):
         """加载YAML配置文件"""
         try:
@@ -161,7 +221,7 @@ class TemplateConfig:
                 )
 
             with open(config_file, 'r', encoding='utf-8') as f:
-                self._raw_config = yaml.safe_load(f)
+                self._raw_config = yaml.load(f, Loader=_YAML_LOADER)
 
             self.logger.debug(f"Loaded config file: {self.config_path}")
 
@@ -178,16 +238,33 @@ class TemplateConfig:
 
             # 解析插入规则
             rules_data = self._raw_config.get("insert_rules", [])
-            self.insert_rules = []
+            self.insert_rules = None
 
-            for rule_data in rules_data:
+            if self.validate:
                 try:
-                    rule = InsertRule(**rule_data)
-                    self.insert_rules.append(rule)
-                except Exception as e:
-                    self.logger.warning(
-                        f"Failed to parse insert rule '{rule_data.get('name')}': {str(e)}"
-                    )
+                    self.insert_rules = _INSERT_RULES_ADAPTER.validate_python(rules_data)
+                except ValidationError:
+                    # 存在无效规则时逐条解析,跳过无效规则并记录警告
+                    pass
+
+            if self.insert_rules is None:
+                self.insert_rules = []
+                for rule_data in rules_data:
+                    try:
+                        if self.validate:
+                            rule = InsertRule(**rule_data)
+                        else:
+                            rule = self._construct_rule(rule_data)
+                        self.insert_rules.append(rule)
+                    except Exception as e:
+                        self.logger.warning(
+                            f"Failed to parse insert rule '{rule_data.get('name')}': {str(e)}"
+                        )
+
+            # 按名称建立索引;重名时与顺序查找一致,返回第一条
+            self._rules_by_name = {
+                rule.name: rule for rule in reversed(self.insert_rules)
+            }
 
             # 解析验证设置
             validation_data = self._raw_config.get("validation", {})
@@ -196,11 +273,63 @@ class TemplateConfig:
             # 解析输出设置
             output_data = self._raw_config.get("output", {})
             self.output = OutputSettings(**output_data)
+            self._filename_tokens = self._compile_filename_pattern(
+                self.output.filename_pattern
+            )
 
         except Exception as e:
             self.logger.error(f"Failed to parse config: {str(e)}")
             raise ValueError(f"Configuration parsing failed: {str(e)}")
 
+    @staticmethod
+    def _construct_rule(rule_data: Dict[str, Any]) -> InsertRule:
+        """
+        不经校验直接构建插入规则(仅用于已验证过的配置)
+
+        model_construct 不会递归处理嵌套模型,这里逐个构建子模型。
+
+        Args:
+            rule_data: YAML中的单条规则
+
+        Returns:
+            InsertRule: 插入规则
+        """
+        data = dict(rule_data)
+        data["insert_position"] = InsertPosition.model_construct(**data["insert_position"])
+        data["data_source"] = DataSource.model_construct(**data["data_source"])
+
+        for key, model in (
+            ("style", StyleConfig),
+            ("ai_config", AIConfig),
+            ("validation", ValidationConfig),
+        ):
+            if data.get(key) is not None:
+                data[key] = model.model_construct(**data[key])
+
+        table_data = data.get("table_config")
+        if table_data is not None:
+            table_fields = {
+                "columns": [
+                    TableColumn.model_construct(**column)
+                    for column in table_data["columns"]
+                ]
+            }
+            if table_data.get("style") is not None:
+                table_fields["style"] = StyleConfig.model_construct(**table_data["style"])
+            data["table_config"] = TableConfig.model_construct(**table_fields)
+
+        return InsertRule.model_construct(**data)
+
+    @cached_property
+    def default_template_path(self) -> str:
+        """默认基础目录下的模板文件路径(首次访问时计算并缓存)"""
+        return str(self._default_base_dir / self.template_info.path)
+
+    @cached_property
+    def default_output_dir(self) -> str:
+        """默认基础目录下的输出目录(首次访问时计算并缓存)"""
+        return str(self._default_base_dir / self.template_info.output_dir)
+
     def get_template_path(self, base_dir: Optional[str] = None) -> str:
         """
         获取模板文件的完整路径
@@ -213,7 +342,7 @@ class TemplateConfig:
         """
         if base_dir is None:
             # 使用配置文件所在目录的父目录
-            base_dir = Path(self.config_path).parent.parent
+            return self.default_template_path
 
         template_path = Path(base_dir) / self.template_info.path
         return str(template_path)
@@ -229,7 +358,7 @@ class TemplateConfig:
             str: 输出目录的完整路径
         """
         if base_dir is None:
-            base_dir = Path(self.config_path).parent.parent
+            return self.default_output_dir
 
         output_dir = Path(base_dir) / self.template_info.output_dir
         return str(output_dir)
@@ -253,10 +382,7 @@ class TemplateConfig:
         Returns:
             Optional[InsertRule]: 插入规则,如果不存在则返回None
         """
-        for rule in self.insert_rules:
-            if rule.name == name:
-                return rule
-        return None
+        return self._rules_by_name.get(name)
 
     def get_validation_settings(self) -> ValidationSettings:
         """获取验证设置"""
@@ -282,15 +408,41 @@ class TemplateConfig:
             str: 输出文件名
         """
         if date is None:
-            from datetime import datetime
             date = datetime.now().strftime("%Y%m%d")
 
-        filename = self.output.filename_pattern.format(
-            company_name=company_name,
-            date=date
-        )
+        values = {"company_name": company_name, "date": date}
+
+        if self._filename_tokens is None:
+            return self.output.filename_pattern.format(**values)
 
-        return filename
+        parts = []
+        for literal, field, spec in self._filename_tokens:
+            parts.append(literal)
+            if field is not None:
+                parts.append(format(values[field], spec))
+
+        return "".join(parts)
+
+    @staticmethod
+    def _compile_filename_pattern(
+        pattern: str
+    ) -> Optional[List[Tuple[str, Optional[str], str]]]:
+        """
+        预先解析文件名模式,避免每次生成文件名时重新解析格式字符串
+
+        Args:
+            pattern: 文件名模式,如 "{company_name}_Report_{date}.docx"
+
+        Returns:
+            Optional[List[Tuple]]: (字面文本, 字段名, 格式说明) 列表;
+                模式使用属性/下标访问或 !r 等转换时返回None,回退到 str.format
+        """
+        tokens = []
+        for literal, field, spec, conversion in string.Formatter().parse(pattern):
+            if field is not None and (conversion or not field.isidentifier()):
+                return None
+            tokens.append((literal, field, spec or ""))
+        return tokens
 
     def __repr__(self) -> str:
         return (
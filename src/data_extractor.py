@@ -5,13 +5,28 @@ This module extracts data from Excel files (SDG questionnaires and impact mechan
 and validates the data using Pydantic models.
 """
 
+import hashlib
 import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
 from datetime import datetime
 
-import openpyxl
-from openpyxl.worksheet.worksheet import Worksheet
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    # Rust-based xlsx reader; loads a whole sheet in one native call
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    # Pure-Python fallback used only when python-calamine is unavailable
+    import openpyxl
+except ImportError:
+    openpyxl = None
 
 from .models import (
     SDGResponse,
@@ -24,6 +39,133 @@ from .models import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Bump when the extracted models change shape so stale cache files are ignored
+_EXTRACTION_CACHE_VERSION = 2
+
+# Row numbers listed per issue in summary warnings
+_MAX_LOGGED_ROWS = 5
+
+# Process-wide memo of parsed extractions, shared by every DataExtractor
+_MEMO_SIZE = 8
+_memo: "OrderedDict[Tuple[Any, ...], list]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+# Process-wide cache of open workbooks keyed by (path, mtime_ns, size), so a
+# run that lists companies and then extracts them parses each file's index once
+_WORKBOOK_CACHE_SIZE = 4
+_workbooks: "OrderedDict[Tuple[str, int, int], Any]" = OrderedDict()
+_workbooks_lock = threading.Lock()
+
+
+# ==================== Calamine Adapter ====================
+
+def _calamine_value(value: Any) -> Any:
+    """
+    Convert a calamine cell value to what openpyxl would return.
+
+    calamine reports empty cells as "" and every number as float, while
+    openpyxl returns None and int for whole numbers.
+    """
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class _CalamineSheet:
+    """The subset of openpyxl's read-only worksheet API used by DataExtractor."""
+
+    def __init__(self, sheet: Any):
+        self._sheet = sheet
+
+    def iter_rows(
+        self,
+        min_row: int = 1,
+        min_col: int = 1,
+        max_col: Optional[int] = None,
+        values_only: bool = True
+    ):
+        """Yield row tuples of cell values (1-based bounds, like openpyxl)."""
+        # skip_empty_area=False keeps row/column 1 at A1 even if it is empty
+        rows = self._sheet.to_python(skip_empty_area=False)
+        width = max_col if max_col is not None else self._sheet.width
+        for row in rows[min_row - 1:]:
+            values = [_calamine_value(v) for v in row[min_col - 1:width]]
+            values.extend([None] * (width - min_col + 1 - len(values)))
+            yield tuple(values)
+
+
+class _CalamineWorkbook:
+    """The subset of openpyxl's read-only workbook API used by DataExtractor."""
+
+    def __init__(self, path: Path):
+        self._workbook = CalamineWorkbook.from_path(str(path))
+        self.sheetnames = list(self._workbook.sheet_names)
+        # Cached workbooks are shared across threads, and the native workbook
+        # rejects concurrent sheet loads ("Already borrowed")
+        self._lock = threading.Lock()
+
+    def __getitem__(self, sheet_name: str) -> _CalamineSheet:
+        with self._lock:
+            return _CalamineSheet(self._workbook.get_sheet_by_name(sheet_name))
+
+    def close(self) -> None:
+        self._workbook.close()
+
+
+# ==================== Schema Business Rules ====================
+
+def _check_company_impact(
+    data: CompanyImpactData,
+    errors: List[ValidationError],
+    warnings: List[str]
+) -> None:
+    """Business rules for CompanyImpactData beyond Pydantic validation."""
+    # Validate company name is not empty
+    if not data.company_name or not data.company_name.strip():
+        errors.append(ValidationError(
+            field="company_name",
+            error_type="required_field",
+            message="Company name cannot be empty"
+        ))
+
+    # Validate mechanisms list is not empty
+    if not data.mechanisms:
+        errors.append(ValidationError(
+            field="mechanisms",
+            error_type="required_field",
+            message="At least one mechanism is required"
+        ))
+
+    # Warn if stakeholders list is empty
+    if not data.stakeholders:
+        warnings.append("Stakeholders list is empty")
+
+
+def _check_sdg_response(
+    data: SDGResponse,
+    errors: List[ValidationError],
+    warnings: List[str]
+) -> None:
+    """Business rules for SDGResponse beyond Pydantic validation."""
+    # Validate company name is not empty
+    if not data.company_name or not data.company_name.strip():
+        errors.append(ValidationError(
+            field="company_name",
+            error_type="required_field",
+            message="Company name cannot be empty"
+        ))
+
+
+# Model type -> business rule check used by DataExtractor.validate_schema
+_SCHEMA_CHECKS: Dict[type, Callable[[Any, List[ValidationError], List[str]], None]] = {
+    CompanyImpactData: _check_company_impact,
+    SDGResponse: _check_sdg_response,
+}
+
 
 class DataExtractor:
     """
@@ -37,54 +179,241 @@ class DataExtractor:
     Data Sources:
     - SDG问卷调查_完整中文版.xlsx / SDG questionnaire (Responses).xlsx
     - Mechanisms.xlsx / 影响评估机制_完整中文版.xlsx
+
+    Workbooks are read with python-calamine, falling back to openpyxl read-only
+    mode when it is not installed; both expose the same iter_rows() API and each
+    worksheet is read once.
     """
 
-    def __init__(self, data_dir: str = "."):
+    # Worksheets in the impact mechanisms workbook that are not companies
+    NON_COMPANY_SHEETS = ("Template sheet", "extra FBB SME interview")
+
+    # Consecutive empty rows after which a company sheet is treated as ended
+    MAX_EMPTY_ROWS = 20
+
+    def __init__(
+        self,
+        data_dir: str = ".",
+        cache_dir: Optional[str] = None,
+        validate_rows: bool = True
+    ):
         """
         Initialize DataExtractor.
 
         Args:
             data_dir: Directory containing Excel data files
+            cache_dir: Directory for JSON extraction results (None, the
+                       default, disables the on-disk cache; the in-process
+                       memo is always used)
+            validate_rows: Run full Pydantic validation on every SDG response
+                           and company record. Pass False for bulk re-extraction
+                           of known-good files; the row values are already
+                           coerced to the model types, so models are then built
+                           with model_construct(). Mechanism rows are always
+                           built this way (ImpactMechanism.build_trusted).
         """
         self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir) / "extract" if cache_dir else None
+        self.validate_rows = validate_rows
         logger.info(f"DataExtractor initialized with data directory: {self.data_dir}")
 
+    # ==================== Extraction Cache ====================
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop the in-process memo of parsed extractions and open workbooks."""
+        with _memo_lock:
+            _memo.clear()
+        DataExtractor.close_workbooks()
+
+    @staticmethod
+    def close_workbooks() -> None:
+        """
+        Close all cached workbooks.
+
+        Long-running processes can call this to release file handles (e.g. so
+        the files can be replaced on Windows); workbooks are reopened on demand.
+        """
+        with _workbooks_lock:
+            workbooks = list(_workbooks.values())
+            _workbooks.clear()
+        for workbook in workbooks:
+            workbook.close()
+
+    def _cached_extract(
+        self,
+        filename: str,
+        args: Tuple[Any, ...],
+        model: Type[ModelT],
+        loader: Callable[[], List[ModelT]]
+    ) -> List[ModelT]:
+        """
+        Return a parsed extraction, reusing earlier results for an unchanged file.
+
+        Results are keyed by the file's path, mtime and size plus the
+        extraction arguments. Lookups go to the in-process memo first, then
+        to a JSON file under cache_dir, and only parse the workbook on a miss.
+
+        Args:
+            filename: Excel file name
+            args: Extraction arguments that affect the result
+            model: Model class of the extracted objects
+            loader: Parses the workbook on a cache miss
+
+        Returns:
+            A new list holding the extracted objects
+        """
+        file_path = self.data_dir / filename
+        if not file_path.exists():
+            # Let the loader raise the usual FileNotFoundError
+            return loader()
+
+        stat = file_path.stat()
+        key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size) + args
+
+        with _memo_lock:
+            if key in _memo:
+                _memo.move_to_end(key)
+                return list(_memo[key])
+
+        adapter = TypeAdapter(List[model])
+        result = self._load_cached(key, adapter)
+        if result is None:
+            result = loader()
+            self._save_cached(key, adapter, result)
+
+        with _memo_lock:
+            _memo[key] = result
+            while len(_memo) > _MEMO_SIZE:
+                _memo.popitem(last=False)
+
+        return list(result)
+
+    def _cache_path(self, key: Tuple[Any, ...]) -> Path:
+        """Path of the JSON cache file for a cache key."""
+        digest = hashlib.sha256(
+            repr((_EXTRACTION_CACHE_VERSION,) + key).encode("utf-8")
+        ).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cached(self, key: Tuple[Any, ...], adapter: TypeAdapter) -> Optional[list]:
+        """Load and validate a cached extraction, or None if absent or invalid."""
+        if self.cache_dir is None:
+            return None
+
+        path = self._cache_path(key)
+        if not path.exists():
+            return None
+
+        try:
+            result = adapter.validate_json(path.read_bytes())
+            logger.info(f"Loaded cached extraction from {path}")
+            return result
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable extraction cache {path}: {e}")
+            return None
+
+    def _save_cached(self, key: Tuple[Any, ...], adapter: TypeAdapter, result: list) -> None:
+        """Persist an extraction; failures only cost a re-parse next time."""
+        if self.cache_dir is None:
+            return
+
+        path = self._cache_path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(adapter.dump_json(result))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write extraction cache {path}: {e}")
+
+    # ==================== Model Construction ====================
+
+    def _build(self, model: Type[ModelT], **fields: Any) -> ModelT:
+        """
+        Create a model from already-coerced row values.
+
+        Args:
+            model: Pydantic model class
+            **fields: Field values
+
+        Returns:
+            Validated model, or an unvalidated one when validate_rows is False
+        """
+        if self.validate_rows:
+            return model(**fields)
+        return model.model_construct(**fields)
+
     # ==================== Excel Reading ====================
 
-    def _open_excel(self, filename: str) -> openpyxl.Workbook:
+    def _open_excel(self, filename: str) -> Any:
         """
         Open an Excel file with error handling.
 
+        Workbooks are cached per file version (path, mtime, size) and shared by
+        every caller, so callers must not close them; use close_workbooks().
+
         Args:
             filename: Name of the Excel file
 
         Returns:
-            openpyxl.Workbook object
+            Calamine-backed workbook, or an openpyxl read-only Workbook when
+            python-calamine is not installed (both expose sheetnames/iter_rows)
 
         Raises:
             FileNotFoundError: If file doesn't exist
             PermissionError: If file cannot be accessed
+            ImportError: If neither python-calamine nor openpyxl is installed
         """
+        if CalamineWorkbook is None and openpyxl is None:
+            raise ImportError("Reading Excel files requires python-calamine (or openpyxl)")
+
         file_path = self.data_dir / filename
 
         if not file_path.exists():
             raise FileNotFoundError(f"Excel file not found: {file_path}")
 
         try:
+            stat = file_path.stat()
+            key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+            with _workbooks_lock:
+                if key in _workbooks:
+                    _workbooks.move_to_end(key)
+                    return _workbooks[key]
+
             logger.info(f"Opening Excel file: {file_path}")
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
+            if CalamineWorkbook is not None:
+                workbook = _CalamineWorkbook(file_path)
+            else:
+                # read_only streams rows lazily instead of building every cell object
+                workbook = openpyxl.load_workbook(
+                    file_path,
+                    read_only=True,
+                    data_only=True,
+                    keep_links=False
+                )
+
+            with _workbooks_lock:
+                # Another thread may have opened the same file meanwhile
+                workbook = _workbooks.setdefault(key, workbook)
+                _workbooks.move_to_end(key)
+                # Evicted workbooks are not closed here: another thread may still
+                # be reading them; they are released once unreferenced
+                while len(_workbooks) > _WORKBOOK_CACHE_SIZE:
+                    _workbooks.popitem(last=False)
             return workbook
         except PermissionError as e:
             raise PermissionError(f"Cannot access file {file_path}: {e}")
         except Exception as e:
             raise Exception(f"Error opening Excel file {file_path}: {e}")
 
-    def _get_worksheet(self, workbook: openpyxl.Workbook, sheet_name: str) -> Worksheet:
+    def _get_worksheet(self, workbook: Any, sheet_name: str) -> Any:
         """
         Get a worksheet from workbook with error handling.
 
         Args:
-            workbook: openpyxl Workbook object
+            workbook: Workbook returned by _open_excel()
             sheet_name: Name of the worksheet
 
         Returns:
@@ -101,6 +430,61 @@ class DataExtractor:
 
         return workbook[sheet_name]
 
+    # ==================== Company Listing ====================
+
+    def list_sdg_company_names(
+        self,
+        filename: str = "SDG问卷调查_完整中文版.xlsx",
+        sheet_name: str = "Form Responses 1"
+    ) -> List[str]:
+        """
+        List company names in the SDG questionnaire without parsing responses.
+
+        Only the company name column (column B) is streamed.
+
+        Args:
+            filename: Excel file name
+            sheet_name: Worksheet name
+
+        Returns:
+            Unique non-empty company names in first-seen order
+        """
+        workbook = self._open_excel(filename)
+        worksheet = self._get_worksheet(workbook, sheet_name)
+
+        # dict.fromkeys de-duplicates in a single pass and keeps first-seen order
+        names = dict.fromkeys(
+            self._clean_value(company_name)
+            for (company_name,) in worksheet.iter_rows(
+                min_row=2, min_col=2, max_col=2, values_only=True
+            )
+        )
+        names.pop(None, None)
+
+        return list(names)
+
+    def list_impact_company_names(
+        self,
+        filename: str = "影响评估机制_完整中文版.xlsx"
+    ) -> List[str]:
+        """
+        List companies in the impact mechanisms workbook without reading sheets.
+
+        Each company has its own worksheet named after it, so the sheet names
+        from the workbook index are enough.
+
+        Args:
+            filename: Excel file name
+
+        Returns:
+            Company (worksheet) names
+        """
+        workbook = self._open_excel(filename)
+        return [
+            name for name in workbook.sheetnames
+            if name not in self.NON_COMPANY_SHEETS
+        ]
+
     # ==================== SDG Questionnaire Extraction ====================
 
     def extract_sdg_questionnaire(
@@ -127,6 +511,15 @@ class DataExtractor:
             FileNotFoundError: If file doesn't exist
             ValueError: If worksheet doesn't exist or data format is invalid
         """
+        return self._cached_extract(
+            filename,
+            ("sdg", sheet_name),
+            SDGResponse,
+            lambda: self._parse_sdg_questionnaire(filename, sheet_name)
+        )
+
+    def _parse_sdg_questionnaire(self, filename: str, sheet_name: str) -> List[SDGResponse]:
+        """Parse the SDG questionnaire worksheet (uncached)."""
         logger.info(f"Extracting SDG questionnaire from {filename}/{sheet_name}")
 
         # Open workbook and get worksheet
@@ -137,6 +530,8 @@ class DataExtractor:
         responses = []
         row_count = 0
         error_count = 0
+        # Rows that needed a default, logged once per issue after the loop
+        issues: Dict[str, List[int]] = defaultdict(list)
 
         # Iterate through rows (skip header row)
         for row_idx, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), start=2):
@@ -158,30 +553,33 @@ class DataExtractor:
                     # Try to parse string timestamp
                     timestamp = datetime.fromisoformat(timestamp.replace(' ', 'T'))
                 elif not isinstance(timestamp, datetime):
-                    logger.warning(f"Row {row_idx}: Invalid timestamp type: {type(timestamp)}")
+                    issues["had an invalid timestamp, using the current time"].append(row_idx)
                     timestamp = datetime.now()  # Fallback
 
                 # Handle edge cases for required fields
                 # Ensure company_name is not empty
-                company_name_str = str(company_name).strip() if company_name else ""
+                company_name_str = self._clean_value(company_name)
                 if not company_name_str:
                     company_name_str = "未知公司"  # "Unknown Company"
-                    logger.warning(f"Row {row_idx}: Empty company_name, using default")
+                    issues["had an empty company_name, using default"].append(row_idx)
 
                 # Ensure contact_name is not empty
-                contact_name_str = str(contact_name).strip() if contact_name else ""
+                contact_name_str = self._clean_value(contact_name)
                 if not contact_name_str:
                     contact_name_str = "未知联系人"  # "Unknown Contact"
-                    logger.warning(f"Row {row_idx}: Empty contact_name, using default")
+                    issues["had an empty contact_name, using default"].append(row_idx)
 
                 # Ensure implementation_description meets minimum length (10 chars)
-                impl_desc_str = str(implementation_description).strip() if implementation_description else ""
+                impl_desc_str = self._clean_value(implementation_description) or ""
                 if len(impl_desc_str) < 10:
                     impl_desc_str = "未提供详细的实施描述信息"  # "No detailed implementation description provided"
-                    logger.warning(f"Row {row_idx}: Short/empty implementation_description, using default")
+                    issues["had a short/empty implementation_description, using default"].append(
+                        row_idx
+                    )
 
-                # Create SDGResponse object (Pydantic will validate)
-                response = SDGResponse(
+                # Create SDGResponse object (validated unless validate_rows=False)
+                response = self._build(
+                    SDGResponse,
                     timestamp=timestamp,
                     company_name=company_name_str,
                     contact_name=contact_name_str,
@@ -197,7 +595,7 @@ class DataExtractor:
                 logger.error(f"Error parsing row {row_idx}: {e}")
                 # Continue processing other rows
 
-        workbook.close()
+        self._log_row_issues(issues, f"{filename}/{sheet_name}")
 
         logger.info(
             f"Extracted {row_count} SDG responses "
@@ -233,6 +631,19 @@ class DataExtractor:
         Raises:
             FileNotFoundError: If file doesn't exist
         """
+        return self._cached_extract(
+            filename,
+            ("impact", company_name),
+            CompanyImpactData,
+            lambda: self._parse_impact_mechanisms(filename, company_name)
+        )
+
+    def _parse_impact_mechanisms(
+        self,
+        filename: str,
+        company_name: Optional[str]
+    ) -> List[CompanyImpactData]:
+        """Parse the impact mechanism worksheets (uncached)."""
         logger.info(f"Extracting impact mechanisms from {filename}")
 
         # Open workbook
@@ -246,7 +657,7 @@ class DataExtractor:
             # Extract all company worksheets (skip Template sheet and other non-company sheets)
             sheet_names = [
                 name for name in workbook.sheetnames
-                if name not in ["Template sheet", "extra FBB SME interview"]
+                if name not in self.NON_COMPANY_SHEETS
             ]
 
         logger.info(f"Processing worksheets: {sheet_names}")
@@ -263,22 +674,20 @@ class DataExtractor:
                 logger.error(f"Error extracting data from worksheet '{sheet_name}': {e}")
                 # Continue processing other worksheets
 
-        workbook.close()
-
         logger.info(f"Extracted data for {len(companies_data)} companies")
 
         return companies_data
 
     def _extract_company_worksheet(
         self,
-        workbook: openpyxl.Workbook,
+        workbook: Any,
         sheet_name: str
     ) -> Optional[CompanyImpactData]:
         """
         Extract data from a single company worksheet.
 
         Args:
-            workbook: openpyxl Workbook object
+            workbook: Workbook returned by _open_excel()
             sheet_name: Name of the worksheet (company name)
 
         Returns:
@@ -288,23 +697,27 @@ class DataExtractor:
 
         worksheet = self._get_worksheet(workbook, sheet_name)
 
+        # Stream the sheet once; read-only worksheets have no cheap random access
+        rows = self._read_company_rows(worksheet)
+
         # Extract key information area (Rows 1-11)
-        sdg_questionnaire_response = self._get_cell_value(worksheet, 1, 2)  # Row 1, Column B
-        alternative_scenario = self._get_cell_value(worksheet, 3, 2)  # Row 3, Column B
+        sdg_questionnaire_response = self._get_cell_value(rows, 1, 2)  # Row 1, Column B
+        alternative_scenario = self._get_cell_value(rows, 3, 2)  # Row 3, Column B
 
         # Extract stakeholders (Rows 6-11, Column B)
         stakeholders = []
-        for row_idx in range(6, 12):  # Rows 6-11
-            stakeholder = self._get_cell_value(worksheet, row_idx, 2)
-            if stakeholder and str(stakeholder).strip():
-                stakeholders.append(str(stakeholder).strip())
+        for row in rows[5:11]:  # Rows 6-11
+            stakeholder = self._clean_value(row[1] if len(row) > 1 else None)
+            if stakeholder:
+                stakeholders.append(stakeholder)
 
         # Extract mechanism data (Row 14+)
-        mechanisms = self._extract_mechanisms_data(worksheet)
+        mechanisms = self._extract_mechanisms_data(rows, sheet_name)
 
         # Create CompanyImpactData object
         try:
-            company_data = CompanyImpactData(
+            company_data = self._build(
+                CompanyImpactData,
                 company_name=sheet_name,
                 sdg_questionnaire_response=sdg_questionnaire_response,
                 alternative_scenario=alternative_scenario,
@@ -323,7 +736,41 @@ class DataExtractor:
             logger.error(f"Error creating CompanyImpactData for {sheet_name}: {e}")
             return None
 
-    def _extract_mechanisms_data(self, worksheet: Worksheet) -> List[ImpactMechanism]:
+    def _read_company_rows(self, worksheet: Any) -> List[Tuple[Any, ...]]:
+        """
+        Read columns A-H of a company worksheet, stopping at trailing blank rows.
+
+        Stale formatting can make a sheet report thousands of empty rows after
+        the data; reading stops once MAX_EMPTY_ROWS consecutive fully empty rows
+        follow the mechanism header (row 14).
+
+        Args:
+            worksheet: Company worksheet
+
+        Returns:
+            Rows as value tuples (row 1 at index 0)
+        """
+        rows = []
+        empty_run = 0
+
+        for row in worksheet.iter_rows(max_col=8, values_only=True):
+            rows.append(row)
+            if any(cell is not None for cell in row):
+                empty_run = 0
+                continue
+
+            empty_run += 1
+            if empty_run >= self.MAX_EMPTY_ROWS and len(rows) > 14:
+                break
+
+        # Trailing blank rows carry no data
+        return rows[:len(rows) - empty_run]
+
+    def _extract_mechanisms_data(
+        self,
+        rows: Sequence[Tuple[Any, ...]],
+        sheet_name: str = ""
+    ) -> List[ImpactMechanism]:
         """
         Extract mechanism data from worksheet (Row 14+).
 
@@ -338,24 +785,26 @@ class DataExtractor:
         8. Unit
 
         Args:
-            worksheet: Worksheet object
+            rows: Worksheet rows as value tuples (row 1 at index 0)
+            sheet_name: Worksheet name, used in log messages
 
         Returns:
             List of ImpactMechanism objects
         """
         mechanisms = []
+        issues: Dict[str, List[int]] = defaultdict(list)
+        # Cells come back as stripped str or None, so no further coercion below
+        clean = self._clean_value
 
         # Start from row 14 (data rows)
-        for row_idx in range(14, worksheet.max_row + 1):
-            # Read 8 columns (A-H)
-            stakeholder_affected = self._get_cell_value(worksheet, row_idx, 1)
-            mechanism = self._get_cell_value(worksheet, row_idx, 2)
-            driving_variable = self._get_cell_value(worksheet, row_idx, 3)
-            type_of_impact = self._get_cell_value(worksheet, row_idx, 4)
-            positive_negative = self._get_cell_value(worksheet, row_idx, 5)
-            method = self._get_cell_value(worksheet, row_idx, 6)
-            value = self._get_cell_value(worksheet, row_idx, 7)
-            unit = self._get_cell_value(worksheet, row_idx, 8)
+        for row_idx, row in enumerate(rows[13:], start=14):
+            # Read 8 columns (A-H), padding short rows
+            cells = [clean(v) for v in row[:8]]
+            cells.extend([None] * (8 - len(cells)))
+            (
+                stakeholder_affected, mechanism, driving_variable, type_of_impact,
+                positive_negative, method, value, unit
+            ) = cells
 
             # Skip rows where stakeholder_affected and mechanism are both empty
             if not stakeholder_affected and not mechanism:
@@ -366,56 +815,83 @@ class DataExtractor:
                 try:
                     value = float(value)
                 except (ValueError, TypeError):
-                    logger.warning(f"Row {row_idx}: Cannot convert value to float: {value}")
+                    issues["had a non-numeric value, set to None"].append(row_idx)
                     value = None
 
-            # Create ImpactMechanism object
-            try:
-                impact_mechanism = ImpactMechanism(
-                    stakeholder_affected=str(stakeholder_affected) if stakeholder_affected else "",
-                    mechanism=str(mechanism) if mechanism else "",
-                    driving_variable=str(driving_variable) if driving_variable else None,
-                    type_of_impact=str(type_of_impact) if type_of_impact else None,
-                    positive_negative=str(positive_negative) if positive_negative else None,
-                    method=str(method) if method else None,
-                    value=value,
-                    unit=str(unit) if unit else None
-                )
+            # Cells are already str/None and value float/None, so the row is
+            # built without re-running Pydantic validation
+            mechanisms.append(ImpactMechanism.build_trusted(
+                stakeholder_affected=stakeholder_affected or "",
+                mechanism=mechanism or "",
+                driving_variable=driving_variable,
+                type_of_impact=type_of_impact,
+                positive_negative=positive_negative,
+                method=method,
+                value=value,
+                unit=unit
+            ))
+
+        self._log_row_issues(issues, sheet_name)
 
-                mechanisms.append(impact_mechanism)
+        return mechanisms
 
-            except Exception as e:
-                logger.error(f"Error creating ImpactMechanism at row {row_idx}: {e}")
-                # Continue processing other rows
+    @staticmethod
+    def _log_row_issues(issues: Dict[str, List[int]], source: str) -> None:
+        """
+        Emit one warning per kind of row issue instead of one per row.
 
-        return mechanisms
+        Args:
+            issues: Issue description -> affected row numbers
+            source: File/worksheet the rows belong to
+        """
+        for issue, row_numbers in issues.items():
+            examples = ", ".join(str(n) for n in row_numbers[:_MAX_LOGGED_ROWS])
+            if len(row_numbers) > _MAX_LOGGED_ROWS:
+                examples += ", ..."
+            logger.warning(
+                "%s: %d rows %s (rows %s)", source, len(row_numbers), issue, examples
+            )
 
-    def _get_cell_value(self, worksheet: Worksheet, row: int, col: int) -> Optional[str]:
+    def _get_cell_value(
+        self,
+        rows: Sequence[Tuple[Any, ...]],
+        row: int,
+        col: int
+    ) -> Optional[str]:
         """
         Get cell value with error handling.
 
         Args:
-            worksheet: Worksheet object
+            rows: Worksheet rows as value tuples (row 1 at index 0)
             row: Row number (1-indexed)
             col: Column number (1-indexed)
 
         Returns:
             Cell value as string or None
         """
-        try:
-            cell = worksheet.cell(row=row, column=col)
-            value = cell.value
+        if row > len(rows) or col > len(rows[row - 1]):
+            return None
 
-            if value is None:
-                return None
+        return DataExtractor._clean_value(rows[row - 1][col - 1])
 
-            # Convert to string and strip whitespace
-            return str(value).strip() if str(value).strip() else None
+    @staticmethod
+    def _clean_value(value: Any) -> Optional[str]:
+        """
+        Normalize a raw cell value.
 
-        except Exception as e:
-            logger.warning(f"Error reading cell ({row}, {col}): {e}")
+        Args:
+            value: Cell value from iter_rows(values_only=True)
+
+        Returns:
+            Stripped string, or None for empty/blank cells
+        """
+        if value is None:
             return None
 
+        # Most cells are already strings; skip the str() round trip for them
+        text = value.strip() if isinstance(value, str) else str(value).strip()
+        return text or None
+
     # ==================== Schema Validation ====================
 
     def validate_schema(
@@ -437,40 +913,20 @@ class DataExtractor:
         warnings = []
 
         # Check if data is a Pydantic model
-        if hasattr(data, 'model_validate'):
+        if isinstance(data, BaseModel):
             # Data is already validated by Pydantic
             logger.info(f"Data type '{data_type}' is already validated by Pydantic")
 
-            # Additional business rule validations
-            if isinstance(data, CompanyImpactData):
-                # Validate company name is not empty
-                if not data.company_name or not data.company_name.strip():
-                    errors.append(ValidationError(
-                        field="company_name",
-                        error_type="required_field",
-                        message="Company name cannot be empty"
-                    ))
-
-                # Validate mechanisms list is not empty
-                if not data.mechanisms:
-                    errors.append(ValidationError(
-                        field="mechanisms",
-                        error_type="required_field",
-                        message="At least one mechanism is required"
-                    ))
-
-                # Warn if stakeholders list is empty
-                if not data.stakeholders:
-                    warnings.append("Stakeholders list is empty")
-
-            elif isinstance(data, SDGResponse):
-                # Validate company name is not empty
-                if not data.company_name or not data.company_name.strip():
-                    errors.append(ValidationError(
-                        field="company_name",
-                        error_type="required_field",
-                        message="Company name cannot be empty"
-                    ))
+            # Additional business rule validations, dispatched on the model type
+            check = _SCHEMA_CHECKS.get(type(data))
+            if check is None:
+                # Subclasses of the checked models (rare) fall back to isinstance
+                check = next(
+                    (fn for cls, fn in _SCHEMA_CHECKS.items() if isinstance(data, cls)),
+                    None
+                )
+            if check is not None:
+                check(data, errors, warnings)
 
         is_valid = len(errors) == 0
 
@@ -0,0 +1,222 @@
+"""
+LLM Response Cache for Case 3 Automation Agent.
+
+This module provides a deterministic, content-addressed cache for AI generation:
+- Cache key = SHA-256(model + prompt + temperature + max_tokens)
+- SQLite-backed persistent storage (standard library only)
+- Thread-safe access for concurrent batch generation
+- Entity-slot abstraction so prompts differing only in company name share entries
+
+相同Prompt重复生成时(重跑失败的批次、开发调试)直接返回缓存结果,
+节省Token费用和网络往返时间。
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+@functools.lru_cache(maxsize=256)
+def _slot_pattern(value: str) -> "re.Pattern[str]":
+    """匹配作为完整词出现的槽位值(前后不紧邻字母、数字或下划线)"""
+    return re.compile(rf"(?<![A-Za-z0-9_]){re.escape(value)}(?![A-Za-z0-9_])")
+
+
+class LLMCache:
+    """
+    LLM响应缓存
+
+    功能:
+    1. 根据模型和生成参数计算确定性的缓存键
+    2. 使用SQLite持久化存储 (生成文本, Token统计)
+    3. 跨进程复用: 再次运行同一批次时无需重新调用API
+    4. 实体槽位抽象: 仅公司名不同的Prompt共用同一条缓存,命中时回填新公司名
+
+    使用示例:
+    ```python
+    cache = LLMCache(".llm_cache")
+    key = LLMCache.make_key("claude-sonnet-4-5", prompt, 0.0, 1000)
+
+    hit = cache.get(key)
+    if hit is None:
+        text, usage = call_api(prompt)
+        cache.set(key, text, usage)
+    ```
+    """
+
+    DB_FILENAME = "responses.sqlite3"
+
+    # 槽位值过短时替换会误伤正文,不做抽象
+    MIN_SLOT_LENGTH = 2
+
+    def __init__(self, cache_dir: str = ".llm_cache"):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录(不存在时自动创建)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+        # 批量生成时多个线程共享同一连接,由锁串行化访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / self.DB_FILENAME),
+            check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, usage TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        计算缓存键
+
+        Args:
+            model: 模型名称
+            prompt: 完整Prompt
+            temperature: 温度参数
+            max_tokens: 最大输出tokens
+
+        Returns:
+            str: SHA-256十六进制摘要
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def abstract_slots(cls, text: str, slots: Dict[str, str]) -> str:
+        """
+        将文本中的实体值替换为槽位标记
+
+        例如 slots={"company_name": "EmergConnect"} 时,
+        "EmergConnect的利益相关者" -> "⟦company_name⟧的利益相关者"
+
+        只替换完整词: 嵌在更长单词中的值(如 "Network" 中的 "Net")保持原样,
+        否则回填其他公司名时会拼出错误的词。
+
+        Args:
+            text: 原始文本(Prompt或生成结果)
+            slots: 槽位名 -> 实体值
+
+        Returns:
+            str: 抽象后的文本
+        """
+        # 先替换较长的值,避免一个值是另一个值的子串时被截断
+        for name, value in sorted(slots.items(), key=lambda kv: len(kv[1]), reverse=True):
+            if len(value) >= cls.MIN_SLOT_LENGTH:
+                text = _slot_pattern(value).sub(f"⟦{name}⟧", text)
+        return text
+
+    @classmethod
+    def abstract_response(cls, text: str, slots: Dict[str, str]) -> Optional[str]:
+        """
+        将生成结果抽象为可跨实体复用的缓存文本
+
+        与 abstract_slots 相同,但实体值仍嵌在更长的词中时返回None:
+        这部分无法抽象,回填后会把本实体的名字带入其他实体的报告。
+
+        Args:
+            text: 生成的文本
+            slots: 槽位名 -> 实体值
+
+        Returns:
+            Optional[str]: 抽象后的文本,不能安全抽象时为None
+        """
+        abstracted = cls.abstract_slots(text, slots)
+        for value in slots.values():
+            if len(value) >= cls.MIN_SLOT_LENGTH and value in abstracted:
+                return None
+        return abstracted
+
+    @staticmethod
+    def fill_slots(text: str, slots: Dict[str, str]) -> str:
+        """
+        将槽位标记回填为当前实体值(abstract_slots 的逆操作)
+
+        Args:
+            text: 含槽位标记的文本
+            slots: 槽位名 -> 实体值
+
+        Returns:
+            str: 回填后的文本
+        """
+        for name, value in slots.items():
+            text = text.replace(f"⟦{name}⟧", value)
+        return text
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        查找缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[str, Dict]]: (生成的文本, Token统计),未命中返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, usage FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, text: str, usage: Dict[str, Any]) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            text: 生成的文本
+            usage: Token使用统计
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, text, usage) VALUES (?, ?, ?)",
+                (key, text, json.dumps(usage))
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """清空所有缓存条目"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+        self.logger.info(f"LLM cache cleared: {self.cache_dir}")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ['LLMCache']
@@ -5,9 +5,15 @@ This module contains all Pydantic models for data validation and type safety.
 根据 PROJECT_PLAN.md 第7节定义的完整数据模型。
 """
 
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator, ValidationInfo
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# dataclass(slots=True) 需要 Python 3.10+,旧版本退化为普通dataclass
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 # ==================== SDG问卷响应模型 ====================
@@ -19,6 +25,9 @@ class SDGResponse(BaseModel):
     工作表: Form Responses 1
     数据规模: 146行 × 5列
     """
+    # 去除首尾空白后再检查 min_length,纯空白的公司名/联系人会被拒绝
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     timestamp: datetime = Field(description="问卷提交时间")
     company_name: str = Field(description="公司名称", min_length=1)
     contact_name: str = Field(description="联系人姓名", min_length=1)
@@ -28,14 +37,6 @@ class SDGResponse(BaseModel):
         min_length=10
     )
 
-    @field_validator('company_name', 'contact_name')
-    @classmethod
-    def validate_not_empty(cls, v: str) -> str:
-        """验证字段不为空"""
-        if not v or not v.strip():
-            raise ValueError("Field cannot be empty")
-        return v.strip()
-
 
 # ==================== 影响机制模型 ====================
 
@@ -54,6 +55,14 @@ class ImpactMechanism(BaseModel):
     value: Optional[float] = Field(default=None, description="影响价值（数值）")
     unit: Optional[str] = Field(default=None, description="单位")
 
+    @classmethod
+    def build_trusted(cls, **fields) -> "ImpactMechanism":
+        """跳过校验构建机制记录(仅用于 DataExtractor 已清洗的行数据)
+
+        未提供的可选字段由 model_construct 填充默认值 None。
+        """
+        return cls.model_construct(**fields)
+
 
 # ==================== 公司影响评估数据模型 ====================
 
@@ -106,47 +115,37 @@ class ReportData(BaseModel):
         description="方法论原则（从方法论文档提取）"
     )
 
-    @field_validator('company_name')
-    @classmethod
-    def validate_company_name_matches(cls, v: str, info: ValidationInfo) -> str:
-        """验证公司名称在SDG响应和影响数据中一致"""
-        if info.data and 'sdg_response' in info.data:
-            if v != info.data['sdg_response'].company_name:
-                raise ValueError("Company name mismatch between fields")
-        return v
-
 
 # ==================== 验证结果模型 ====================
 
-class ValidationError(BaseModel):
+# 验证结果与引用信息只在内部构建,不接收外部输入,使用 slots dataclass 省去 Pydantic 校验开销
+
+@dataclass(**DATACLASS_SLOTS)
+class ValidationError:
     """验证错误详情"""
-    field: str = Field(description="字段名")
-    error_type: str = Field(description="错误类型")
-    message: str = Field(description="错误消息")
+    field: str  # 字段名
+    error_type: str  # 错误类型
+    message: str  # 错误消息
 
 
-class ValidationResult(BaseModel):
+@dataclass(**DATACLASS_SLOTS)
+class ValidationResult:
     """数据验证结果"""
-    is_valid: bool = Field(description="是否通过验证")
-    errors: List[ValidationError] = Field(
-        default_factory=list,
-        description="验证错误列表"
-    )
-    warnings: List[str] = Field(
-        default_factory=list,
-        description="警告信息列表"
-    )
+    is_valid: bool  # 是否通过验证
+    errors: List[ValidationError] = field(default_factory=list)  # 验证错误列表
+    warnings: List[str] = field(default_factory=list)  # 警告信息列表
 
 
 # ==================== 生成结果模型 ====================
 
-class CitationInfo(BaseModel):
+@dataclass(**DATACLASS_SLOTS)
+class CitationInfo:
     """引用信息（可追溯性）"""
-    statement: str = Field(description="具体陈述")
-    source_file: str = Field(description="源文件名")
-    source_sheet: Optional[str] = Field(default=None, description="工作表名")
-    source_row: Optional[int] = Field(default=None, description="行号")
-    source_column: Optional[str] = Field(default=None, description="列名")
+    statement: str  # 具体陈述
+    source_file: str  # 源文件名
+    source_sheet: Optional[str] = None  # 工作表名
+    source_row: Optional[int] = None  # 行号
+    source_column: Optional[str] = None  # 列名
 
 
 class GenerationResult(BaseModel):
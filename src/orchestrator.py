@@ -7,11 +7,21 @@ This module coordinates all components to generate complete impact assessment re
 
 import json
 import logging
+import operator
 import os
+import re
 import time
+from collections import ChainMap
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+try:
+    import orjson  # 可选: 更快的JSON序列化
+except ImportError:
+    orjson = None
 
 from .config_loader import TemplateConfig, InsertRule
 from .data_extractor import DataExtractor
@@ -20,6 +30,7 @@ from .ai_generator import AITextGenerator, APIConfig
 from .models import (
     SDGResponse,
     CompanyImpactData,
+    ImpactMechanism,
     ReportData,
     GenerationResult,
     CitationInfo,
@@ -28,6 +39,14 @@ from .models import (
 )
 
 
+# 模板占位符: 任意不含花括号的键,数据中没有的键原样保留
+_PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+
+# 可追溯性引用中记录的数据源文件名
+_SDG_SOURCE_FILE = "SDG问卷调查_完整中文版.xlsx"
+_MECHANISMS_SOURCE_FILE = "Mechanisms.xlsx"
+
+
 # ==================== 报告编排器 ====================
 
 class ReportOrchestrator:
@@ -52,12 +71,16 @@ class ReportOrchestrator:
     ```
     """
 
+    # 并发生成AI规则内容的最大线程数(实际API并发另受 LLM_MAX_CONCURRENCY 限制)
+    MAX_AI_WORKERS = 8
+
     def __init__(
         self,
         data_dir: str,
         config_path: str,
         api_config: APIConfig,
-        base_dir: Optional[str] = None
+        base_dir: Optional[str] = None,
+        extract_cache_dir: Optional[str] = None
     ):
         """
         初始化报告编排器
@@ -67,6 +90,7 @@ class ReportOrchestrator:
             config_path: 配置文件路径
             api_config: AI API配置
             base_dir: 基础目录(默认为当前目录)
+            extract_cache_dir: Excel提取结果的磁盘缓存目录(默认不启用)
         """
         self.base_dir = base_dir or os.getcwd()
         self.logger = logging.getLogger(__name__)
@@ -75,11 +99,11 @@ class ReportOrchestrator:
         self.logger.info("Initializing ReportOrchestrator...")
 
         # 1. 加载配置
-        self.config = TemplateConfig(config_path)
+        self.config = TemplateConfig.load(config_path)
         self.logger.info(f"Loaded configuration: {len(self.config.get_insert_rules())} rules")
 
         # 2. 初始化数据提取器
-        self.data_extractor = DataExtractor(data_dir)
+        self.data_extractor = DataExtractor(data_dir, cache_dir=extract_cache_dir)
         self.logger.info("DataExtractor initialized")
 
         # 3. 初始化AI生成器
@@ -92,6 +116,19 @@ class ReportOrchestrator:
         # 性能指标
         self.metrics: Dict[str, Any] = {}
 
+        # 插入位置查找方法: InsertPosition.method -> 查找函数
+        self._position_finders: Dict[str, Callable[[Any], Any]] = {
+            "after_paragraph": self._find_after_paragraph,
+            "after_section": self._find_after_section,
+            "end_of_document": self._find_end_of_document,
+        }
+
+        # 当前模板中按样式查找的段落,每次加载模板时清空
+        self._style_cache: Dict[str, List[Any]] = {}
+
+        # 当前报告的数据来源状态说明,加载数据后生成一次,报告结束时清空
+        self._data_status: Optional[str] = None
+
         self.logger.info("ReportOrchestrator initialization complete")
 
     def generate_report(
@@ -123,76 +160,19 @@ class ReportOrchestrator:
         start_time = time.time()
         self.logger.info(f"Starting report generation for: {company_name}")
 
+        # 编排器可在批量生成中复用,Token统计按单份报告计算
+        self.ai_generator.reset_usage()
+
+        config = self.config
+        rules = config.get_insert_rules()
+
         try:
             # ===== 步骤1: 提取数据 =====
             self.logger.info("Step 1: Extracting data...")
             step1_start = time.time()
 
-            # 提取SDG问卷数据
-            all_sdg_responses = self.data_extractor.extract_sdg_questionnaire()
-            sdg_response = self._find_sdg_response(all_sdg_responses, company_name)
-
-            # 提取影响机制数据
-            all_impact_data = self.data_extractor.extract_impact_mechanisms()
-            impact_data = self._find_impact_data(all_impact_data, company_name)
-
-            if not impact_data:
-                # 优雅降级: 创建默认的影响评估机制数据
-                self.logger.warning(
-                    f"No impact mechanism data found for company: {company_name}. "
-                    f"Creating default impact data for graceful degradation."
-                )
-                from .models import CompanyImpactData
-                
-                impact_data = CompanyImpactData(
-                    company_name=company_name,
-                    stakeholders=[],  # 空的利益相关者列表
-                    mechanisms=[]  # 空的影响机制列表
-                )
-
-            # 智能双向匹配逻辑:
-            # 如果第一次没找到SDG响应,尝试利用影响机制中的完整公司名再次查找
-            # 场景1: 用户输入"公司B" -> Mechanisms找到"公司B/Sparkinity" -> 用这个全名去SDG找
-            # 场景2: SDG里的名字(如"Sparkinity")被包含在Mechanism名字(如"公司B/Sparkinity")里
-            if not sdg_response and impact_data:
-                self.logger.info(
-                    f"SDG response not found for '{company_name}', "
-                    f"trying intelligent matching with mechanism name: '{impact_data.company_name}'"
-                )
-                
-                # 尝试1: 用Mechanism的完整名字去SDG里找
-                sdg_response = self._find_sdg_response(all_sdg_responses, impact_data.company_name)
-                
-                # 尝试2: 看看SDG里的哪个名字被包含在Mechanism名字里
-                if not sdg_response:
-                    mechanism_name_lower = impact_data.company_name.lower()
-                    for resp in all_sdg_responses:
-                        resp_name_lower = resp.company_name.lower()
-                        # 检查SDG公司名是否是Mechanism名字的子串
-                        if resp_name_lower in mechanism_name_lower:
-                            self.logger.info(
-                                f"Found SDG response '{resp.company_name}' "
-                                f"inside mechanism name '{impact_data.company_name}'"
-                            )
-                            sdg_response = resp
-                            break
-
-            # 优雅降级: 如果仍然找不到SDG响应,创建一个默认的
-            if not sdg_response:
-                self.logger.warning(
-                    f"No SDG questionnaire response found for company: {company_name}. "
-                    f"Creating default SDG response for graceful degradation."
-                )
-                from datetime import datetime
-                from .models import SDGResponse
-                
-                sdg_response = SDGResponse(
-                    timestamp=datetime.now(),
-                    company_name=impact_data.company_name,
-                    contact_name="未提供联系人信息",
-                    sdg_goals="未在SDG问卷中找到该公司的可持续发展目标信息",
-                    implementation_description="未在SDG问卷中找到该公司的实施描述信息"
-                )
+            sdg_response, impact_data = self._load_company_data(company_name)
+            self._data_status = self._data_source_status(sdg_response, impact_data)
 
             step1_time = time.time() - step1_start
             self.logger.info(f"Data extraction completed in {step1_time:.2f}s")
@@ -207,29 +187,40 @@ class ReportOrchestrator:
 
             # ===== 步骤3: 加载Word模板 =====
             self.logger.info("Step 3: Loading Word template...")
-            template_path = self.config.get_template_path(self.base_dir)
+            template_path = config.get_template_path(self.base_dir)
 
             self.template_handler = WordTemplateHandler(template_path)
+            self._style_cache = {}
             self.logger.info(f"Loaded template: {template_path}")
 
             # ===== 步骤4-6: 根据配置规则填充内容 =====
             self.logger.info("Step 4-6: Processing insert rules...")
             traceability_map: List[CitationInfo] = []
 
-            for rule in self.config.get_insert_rules():
-                self.logger.info(f"Processing rule: {rule.name}")
-
-                try:
-                    citations = self._process_insert_rule(
-                        rule,
-                        sdg_response,
-                        impact_data
-                    )
-                    traceability_map.extend(citations)
-
-                except Exception as e:
-                    self.logger.error(f"Failed to process rule '{rule.name}': {str(e)}")
-                    raise
+            # AI规则的API调用是I/O密集的,先并发提交; 文档修改(python-docx非线程安全)
+            # 仍在主线程按规则顺序进行。插入位置均为模板原有段落,批量编辑期间
+            # 段落查找索引不随每次插入重建
+            with ThreadPoolExecutor(max_workers=self.MAX_AI_WORKERS) as executor, \
+                    self.template_handler.batch_edits():
+                ai_futures = self._submit_ai_rules(executor, rules, sdg_response, impact_data)
+
+                for rule in rules:
+                    self.logger.info(f"Processing rule: {rule.name}")
+
+                    try:
+                        citations = self._process_insert_rule(
+                            rule,
+                            sdg_response,
+                            impact_data,
+                            ai_futures.get(id(rule))
+                        )
+                        traceability_map.extend(citations)
+
+                    except Exception as e:
+                        self.logger.error(f"Failed to process rule '{rule.name}': {str(e)}")
+                        for future in ai_futures.values():
+                            future.cancel()
+                        raise
 
             # ===== 步骤7: 最终验证 =====
             self.logger.info("Step 7: Final validation...")
@@ -238,17 +229,17 @@ class ReportOrchestrator:
             # ===== 步骤8: 保存报告 =====
             self.logger.info("Step 8: Saving report...")
             if not output_path:
-                output_dir = self.config.get_output_dir(self.base_dir)
+                output_dir = config.get_output_dir(self.base_dir)
                 os.makedirs(output_dir, exist_ok=True)
 
-                filename = self.config.get_output_filename(company_name)
+                filename = config.get_output_filename(company_name)
                 output_path = os.path.join(output_dir, filename)
 
             self.template_handler.save_document(output_path)
             self.logger.info(f"Report saved to: {output_path}")
 
             # ===== 步骤9: 生成可追溯性JSON =====
-            if self.config.output.generate_traceability_json:
+            if config.output.generate_traceability_json:
                 self.logger.info("Step 9: Generating traceability JSON...")
                 traceability_path = self._save_traceability_json(
                     company_name,
@@ -259,13 +250,13 @@ class ReportOrchestrator:
 
             # 计算性能指标
             total_time = time.time() - start_time
-            token_usage = self.ai_generator.get_total_usage().model_dump()
+            token_usage = self.ai_generator.get_total_usage_dict()
 
             self.metrics = {
                 "company_name": company_name,
                 "total_time": total_time,
                 "data_extraction_time": step1_time,
-                "rules_processed": len(self.config.get_insert_rules()),
+                "rules_processed": len(rules),
                 "ai_token_usage": token_usage,
                 "traceability_entries": len(traceability_map)
             }
@@ -295,22 +286,122 @@ class ReportOrchestrator:
                 metrics=self.metrics
             )
 
+        finally:
+            self._data_status = None
+
+    def _load_company_data(
+        self,
+        company_name: str
+    ) -> Tuple[SDGResponse, CompanyImpactData]:
+        """
+        提取并匹配公司的SDG问卷响应和影响机制数据
+
+        找不到的数据会以默认值优雅降级,因此总是返回一对数据。
+
+        Args:
+            company_name: 公司名称
+
+        Returns:
+            Tuple[SDGResponse, CompanyImpactData]: (SDG响应, 影响机制数据)
+        """
+        # 提取SDG问卷数据
+        # SDG响应可能按两个名字查找,索引只建立一次
+        all_sdg_responses = self.data_extractor.extract_sdg_questionnaire()
+        sdg_index = self._company_name_index(all_sdg_responses)
+        sdg_response = self._find_sdg_response(all_sdg_responses, company_name, sdg_index)
+
+        # 提取影响机制数据
+        all_impact_data = self.data_extractor.extract_impact_mechanisms()
+        impact_data = self._find_impact_data(all_impact_data, company_name)
+
+        if not impact_data:
+            # 优雅降级: 创建默认的影响评估机制数据
+            self.logger.warning(
+                f"No impact mechanism data found for company: {company_name}. "
+                f"Creating default impact data for graceful degradation."
+            )
+            impact_data = CompanyImpactData(
+                company_name=company_name,
+                stakeholders=[],  # 空的利益相关者列表
+                mechanisms=[]  # 空的影响机制列表
+            )
+
+        # 智能双向匹配逻辑:
+        # 如果第一次没找到SDG响应,尝试利用影响机制中的完整公司名再次查找
+        # 场景1: 用户输入"公司B" -> Mechanisms找到"公司B/Sparkinity" -> 用这个全名去SDG找
+        # 场景2: SDG里的名字(如"Sparkinity")被包含在Mechanism名字(如"公司B/Sparkinity")里
+        if not sdg_response and impact_data:
+            self.logger.info(
+                f"SDG response not found for '{company_name}', "
+                f"trying intelligent matching with mechanism name: '{impact_data.company_name}'"
+            )
+
+            # 用Mechanism的完整名字去SDG里找; 包含匹配是双向的,
+            # 也覆盖了SDG名字被包含在Mechanism名字里的情况(场景2)
+            sdg_response = self._find_sdg_response(
+                all_sdg_responses, impact_data.company_name, sdg_index
+            )
+
+        # 优雅降级: 如果仍然找不到SDG响应,创建一个默认的
+        if not sdg_response:
+            self.logger.warning(
+                f"No SDG questionnaire response found for company: {company_name}. "
+                f"Creating default SDG response for graceful degradation."
+            )
+            sdg_response = SDGResponse(
+                timestamp=datetime.now(),
+                company_name=impact_data.company_name,
+                contact_name="未提供联系人信息",
+                sdg_goals="未在SDG问卷中找到该公司的可持续发展目标信息",
+                implementation_description="未在SDG问卷中找到该公司的实施描述信息"
+            )
+
+        return sdg_response, impact_data
+
+    def collect_ai_requests(self, company_name: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        收集公司报告中所有AI生成规则的 (Prompt模板, 数据)
+
+        供批处理模式预先提交生成请求使用,不加载模板也不调用API。
+
+        Args:
+            company_name: 公司名称
+
+        Returns:
+            List[Tuple[str, Dict]]: 与 generate_report 中AI生成调用一致的请求列表
+        """
+        sdg_response, impact_data = self._load_company_data(company_name)
+        self._data_status = self._data_source_status(sdg_response, impact_data)
+
+        try:
+            return [
+                (
+                    rule.prompt_template or "",
+                    self._extract_data_for_rule(rule, sdg_response, impact_data)
+                )
+                for rule in self.config.get_insert_rules()
+                if rule.content_type == "ai_generated"
+            ]
+        finally:
+            self._data_status = None
+
     def _find_sdg_response(
         self,
         all_responses: List[SDGResponse],
-        company_name: str
+        company_name: str,
+        index: Optional[Tuple[Dict[str, Any], List[Tuple[str, Any]]]] = None
     ) -> Optional[SDGResponse]:
-        """查找指定公司的SDG问卷响应（支持模糊匹配）"""
+        """查找指定公司的SDG问卷响应（支持模糊匹配; index 为预先建立的公司名索引）"""
         search_name = company_name.lower()
+        by_name, pairs = index or self._company_name_index(all_responses)
 
         # 1. 精确匹配
-        for response in all_responses:
-            if response.company_name.lower() == search_name:
-                return response
+        response = by_name.get(search_name)
+        if response is not None:
+            return response
 
         # 2. 包含匹配（搜索词在公司名中，或公司名在搜索词中）
-        for response in all_responses:
-            resp_name = response.company_name.lower()
+        for resp_name, response in pairs:
             if search_name in resp_name or resp_name in search_name:
                 self.logger.info(f"Fuzzy matched SDG response: '{response.company_name}' for search '{company_name}'")
                 return response
@@ -324,21 +415,39 @@ class ReportOrchestrator:
     ) -> Optional[CompanyImpactData]:
         """查找指定公司的影响机制数据（支持模糊匹配）"""
         search_name = company_name.lower()
+        by_name, pairs = self._company_name_index(all_data)
 
         # 1. 精确匹配
-        for data in all_data:
-            if data.company_name.lower() == search_name:
-                return data
+        data = by_name.get(search_name)
+        if data is not None:
+            return data
 
         # 2. 包含匹配
-        for data in all_data:
-            data_name = data.company_name.lower()
+        for data_name, data in pairs:
             if search_name in data_name or data_name in search_name:
                 self.logger.info(f"Fuzzy matched impact data: '{data.company_name}' for search '{company_name}'")
                 return data
 
         return None
 
+    @staticmethod
+    def _company_name_index(
+        items: List[Any]
+    ) -> Tuple[Dict[str, Any], List[Tuple[str, Any]]]:
+        """
+        按小写公司名建立索引: 精确匹配直接查表,包含匹配复用已转换的小写名
+
+        Args:
+            items: 带 company_name 属性的对象列表
+
+        Returns:
+            Tuple[Dict, List]: (小写名 -> 第一个匹配对象, 按原顺序的 (小写名, 对象) 列表)
+        """
+        pairs = [(item.company_name.lower(), item) for item in items]
+        # 重名时与顺序查找一致,返回第一条
+        by_name = {name: item for name, item in reversed(pairs)}
+        return by_name, pairs
+
     def _validate_data(
         self,
         sdg_response: SDGResponse,
@@ -348,17 +457,16 @@ class ReportOrchestrator:
         errors: List[ValidationError] = []
         warnings: List[str] = []
 
-        # 检查公司名称一致性（允许模糊匹配的情况）
+        # 检查公司名称一致性（允许模糊匹配的情况; 包含关系已涵盖名称相同）
         sdg_name = sdg_response.company_name.lower()
         impact_name = impact_data.company_name.lower()
-        if sdg_name != impact_name and sdg_name not in impact_name and impact_name not in sdg_name:
+        if sdg_name not in impact_name and impact_name not in sdg_name:
             errors.append(ValidationError(
                 field="company_name",
                 error_type="mismatch",
                 message=f"Company name mismatch: '{sdg_response.company_name}' vs '{impact_data.company_name}'"
             ))
 
-
         # 警告: 缺少可选字段（优雅降级支持）
         if not impact_data.mechanisms:
             warnings.append("No impact mechanisms found (using graceful degradation)")
@@ -374,11 +482,50 @@ class ReportOrchestrator:
             warnings=warnings
         )
 
+    def _submit_ai_rules(
+        self,
+        executor: ThreadPoolExecutor,
+        rules: List[InsertRule],
+        sdg_response: SDGResponse,
+        impact_data: CompanyImpactData
+    ) -> Dict[int, "Future[GenerationResult]"]:
+        """
+        并发提交AI生成规则的API调用
+
+        只提交能找到插入位置的规则(与逐条处理时跳过的规则一致)。
+        只有一条AI规则时不值得切换线程,留给 _process_ai_generated_rule 直接生成。
+
+        Args:
+            executor: 线程池
+            rules: 全部插入规则
+            sdg_response: SDG问卷响应
+            impact_data: 影响机制数据
+
+        Returns:
+            Dict[int, Future]: id(rule) -> 生成结果
+        """
+        ai_rules = [
+            rule for rule in rules
+            if rule.content_type == "ai_generated"
+            and self._find_insert_position(rule.insert_position)
+        ]
+        if len(ai_rules) < 2:
+            return {}
+
+        return {
+            id(rule): executor.submit(
+                self.ai_generator.generate_text,
+                **self._ai_generation_kwargs(rule, sdg_response, impact_data)
+            )
+            for rule in ai_rules
+        }
+
     def _process_insert_rule(
         self,
         rule: InsertRule,
         sdg_response: SDGResponse,
-        impact_data: CompanyImpactData
+        impact_data: CompanyImpactData,
+        ai_future: Optional["Future[GenerationResult]"] = None
     ) -> List[CitationInfo]:
         """
         处理单个插入规则
@@ -389,6 +536,12 @@ class ReportOrchestrator:
         - structured_table: 插入表格
         - traceability: 可追溯性附录
 
+        Args:
+            rule: 插入规则
+            sdg_response: SDG问卷响应
+            impact_data: 影响机制数据
+            ai_future: 已提交的AI生成结果(可选,见 _submit_ai_rules)
+
         Returns:
             List[CitationInfo]: 生成的引用信息
         """
@@ -406,7 +559,10 @@ class ReportOrchestrator:
             citations = self._process_template_rule(rule, position, sdg_response, impact_data)
 
         elif rule.content_type == "ai_generated":
-            citations = self._process_ai_generated_rule(rule, position, sdg_response, impact_data)
+            citations = self._process_ai_generated_rule(
+                rule, position, sdg_response, impact_data,
+                ai_future.result() if ai_future is not None else None
+            )
 
         elif rule.content_type == "structured_table":
             citations = self._process_table_rule(rule, position, impact_data)
@@ -425,30 +581,46 @@ class ReportOrchestrator:
         if not self.template_handler:
             return None
 
-        method = position_config.method
+        finder = self._position_finders.get(position_config.method)
+        if finder is None:
+            self.logger.warning(f"Unknown insert position method: {position_config.method}")
+            return None
 
-        if method == "after_paragraph":
-            return self.template_handler.find_paragraph_by_text_and_style(
-                text=position_config.target_text,
-                style=position_config.target_style
-            )
+        return finder(position_config)
 
-        elif method == "after_section":
-            paragraphs = self.template_handler.find_paragraphs_by_style(
-                style=position_config.target_style
-            )
-            # 查找匹配的段落
-            for p in paragraphs:
-                if position_config.target_text and position_config.target_text in p.text:
-                    return p
-            return None
+    def _find_after_paragraph(self, position_config) -> Any:
+        """after_paragraph: 按文本和样式查找段落"""
+        return self.template_handler.find_paragraph_by_text_and_style(
+            text=position_config.target_text,
+            style=position_config.target_style
+        )
 
-        elif method == "end_of_document":
-            # 返回最后一个段落
-            if self.template_handler.document.paragraphs:
-                return self.template_handler.document.paragraphs[-1]
-            return None
+    def _find_after_section(self, position_config) -> Any:
+        """after_section: 在指定样式的段落中查找包含目标文本的段落"""
+        paragraphs = self._paragraphs_by_style(position_config.target_style)
+        # 查找匹配的段落
+        for p in paragraphs:
+            if position_config.target_text and position_config.target_text in p.text:
+                return p
+        return None
+
+    def _paragraphs_by_style(self, style: str) -> List[Any]:
+        """
+        按样式查找模板段落,同一份报告内每种样式只扫描一次文档
 
+        缓存的是模板原有的段落; 之后插入的内容不会成为 after_section 的定位目标。
+        """
+        paragraphs = self._style_cache.get(style)
+        if paragraphs is None:
+            paragraphs = self.template_handler.find_paragraphs_by_style(style=style)
+            self._style_cache[style] = paragraphs
+        return paragraphs
+
+    def _find_end_of_document(self, position_config) -> Any:
+        """end_of_document: 返回最后一个段落"""
+        paragraphs = self.template_handler.document.paragraphs
+        if paragraphs:
+            return paragraphs[-1]
         return None
 
     def _process_template_rule(
@@ -459,8 +631,6 @@ class ReportOrchestrator:
         impact_data: CompanyImpactData
     ) -> List[CitationInfo]:
         """处理模板类型的规则"""
-        citations: List[CitationInfo] = []
-
         # 准备数据
         data = self._extract_data_for_rule(rule, sdg_response, impact_data)
 
@@ -476,39 +646,52 @@ class ReportOrchestrator:
             )
 
         # 记录引用
-        for field_name, field_value in data.items():
-            citations.append(CitationInfo(
+        return [
+            CitationInfo(
                 statement=f"{field_name}: {field_value}",
-                source_file="SDG问卷调查_完整中文版.xlsx",
+                source_file=_SDG_SOURCE_FILE,
                 source_column=field_name
-            ))
-
-        return citations
+            )
+            for field_name, field_value in data.items()
+        ]
 
-    def _process_ai_generated_rule(
+    def _ai_generation_kwargs(
         self,
         rule: InsertRule,
-        position: Any,
         sdg_response: SDGResponse,
         impact_data: CompanyImpactData
-    ) -> List[CitationInfo]:
-        """处理AI生成类型的规则"""
+    ) -> Dict[str, Any]:
+        """准备AI生成规则调用 generate_text 的参数"""
         # 准备数据
         data = self._extract_data_for_rule(rule, sdg_response, impact_data)
 
-        # AI生成内容
-        source_data = {
+        # 在数据之下叠加默认来源信息,不复制 data (与 {**defaults, **data} 相同,data 优先)
+        source_data = ChainMap(data, {
             "company_name": impact_data.company_name,
-            "source_file": "Mechanisms.xlsx",
-            **data
+            "source_file": _MECHANISMS_SOURCE_FILE
+        })
+
+        return {
+            "prompt_template": rule.prompt_template or "",
+            "data": data,
+            "source_data": source_data,
+            "validate_grounding": rule.validation.require_grounding if rule.validation else True
         }
 
-        result = self.ai_generator.generate_text(
-            prompt_template=rule.prompt_template or "",
-            data=data,
-            source_data=source_data,
-            validate_grounding=rule.validation.require_grounding if rule.validation else True
-        )
+    def _process_ai_generated_rule(
+        self,
+        rule: InsertRule,
+        position: Any,
+        sdg_response: SDGResponse,
+        impact_data: CompanyImpactData,
+        result: Optional[GenerationResult] = None
+    ) -> List[CitationInfo]:
+        """处理AI生成类型的规则(result 为预先并发生成的结果,未提供时在此生成)"""
+        # AI生成内容
+        if result is None:
+            result = self.ai_generator.generate_text(
+                **self._ai_generation_kwargs(rule, sdg_response, impact_data)
+            )
 
         if not result.success:
             raise ValueError(f"AI generation failed: {result.validation_errors}")
@@ -539,30 +722,33 @@ class ReportOrchestrator:
 
         # 获取机制数据
         mechanisms = impact_data.mechanisms
+        columns = rule.table_config.columns
+        sheet_name = impact_data.company_name
+
+        # 每列的取值函数只构建一次; 模型字段用C实现的attrgetter,未知字段保持空字符串
+        model_fields = ImpactMechanism.model_fields
+        getters = [
+            (
+                operator.attrgetter(col.field) if col.field in model_fields
+                else (lambda _mechanism, name=col.field: getattr(_mechanism, name, "")),
+                col.format
+            )
+            for col in columns
+        ]
 
         # 准备表格数据
-        table_data = []
-        header_row = [col.name for col in rule.table_config.columns]
-        table_data.append(header_row)
+        table_data = [[col.name for col in columns]]
 
         for mechanism in mechanisms:
-            row = []
-            for col in rule.table_config.columns:
-                value = getattr(mechanism, col.field, "")
-
-                # 格式化数值
-                if col.format and isinstance(value, (int, float)):
-                    value = col.format.format(value)
-
-                row.append(str(value) if value is not None else "")
-
-            table_data.append(row)
+            table_data.append([
+                self._format_cell(getter(mechanism), fmt) for getter, fmt in getters
+            ])
 
             # 记录引用
             citations.append(CitationInfo(
                 statement=f"Mechanism: {mechanism.mechanism}",
-                source_file="Mechanisms.xlsx",
-                source_sheet=impact_data.company_name
+                source_file=_MECHANISMS_SOURCE_FILE,
+                source_sheet=sheet_name
             ))
 
         # 插入表格
@@ -580,6 +766,13 @@ class ReportOrchestrator:
 
         return citations
 
+    @staticmethod
+    def _format_cell(value: Any, fmt: Optional[str]) -> str:
+        """格式化表格单元格: 数值按列格式输出,None输出为空字符串"""
+        if fmt and isinstance(value, (int, float)):
+            return fmt.format(value)
+        return str(value) if value is not None else ""
+
     def _extract_data_for_rule(
         self,
         rule: InsertRule,
@@ -610,38 +803,55 @@ class ReportOrchestrator:
             value = getattr(source_obj, field_name, None)
             data[field_name] = value
 
-        # 添加数据来源状态说明
-        status_lines = []
+        # 添加数据来源状态说明(报告生成期间使用加载数据时生成的结果)
+        status = self._data_status
+        if status is None:
+            status = self._data_source_status(sdg_response, impact_data)
+        data['data_source_status'] = status
+
+        return data
 
+    @staticmethod
+    def _data_source_status(
+        sdg_response: SDGResponse,
+        impact_data: CompanyImpactData
+    ) -> str:
+        """
+        生成数据来源状态说明
+
+        Args:
+            sdg_response: SDG问卷响应
+            impact_data: 影响机制数据
+
+        Returns:
+            str: 两行状态说明
+        """
         # 检查SDG数据是否为默认值
         if sdg_response.contact_name == "未提供联系人信息":
-            status_lines.append("⚠️ SDG问卷数据: 使用默认值（未找到该公司的SDG问卷响应）")
+            sdg_line = "⚠️ SDG问卷数据: 使用默认值（未找到该公司的SDG问卷响应）"
         else:
-            status_lines.append("✓ SDG问卷数据: 来自真实问卷响应")
+            sdg_line = "✓ SDG问卷数据: 来自真实问卷响应"
 
         # 检查影响评估数据是否为默认值
         if not impact_data.mechanisms:
-            status_lines.append("⚠️ 影响评估数据: 使用默认值（未找到该公司的影响评估机制数据）")
+            impact_line = "⚠️ 影响评估数据: 使用默认值（未找到该公司的影响评估机制数据）"
         else:
-            status_lines.append(f"✓ 影响评估数据: 包含 {len(impact_data.mechanisms)} 个影响机制")
+            impact_line = f"✓ 影响评估数据: 包含 {len(impact_data.mechanisms)} 个影响机制"
 
-        data['data_source_status'] = '\n'.join(status_lines)
+        return f"{sdg_line}\n{impact_line}"
 
-        return data
     def _fill_template(self, template: str, data: Dict[str, Any]) -> str:
-        """填充模板"""
-        content = template
-
-        for key, value in data.items():
-            placeholder = "{" + key + "}"
+        """填充模板(单次扫描替换所有占位符,填入的值不会被再次替换)"""
+        def render(match: "re.Match[str]") -> str:
+            key = match.group(1)
+            if key not in data:
+                return match.group(0)
+            value = data[key]
             if isinstance(value, list):
-                value_str = ", ".join(str(v) for v in value)
-            else:
-                value_str = str(value) if value is not None else ""
-
-            content = content.replace(placeholder, value_str)
+                return ", ".join(map(str, value))
+            return str(value) if value is not None else ""
 
-        return content
+        return _PLACEHOLDER_RE.sub(render, template)
 
     def _save_traceability_json(
         self,
@@ -650,20 +860,27 @@ class ReportOrchestrator:
         report_path: str
     ) -> str:
         """保存可追溯性JSON文件"""
-        # 生成JSON文件路径
-        json_path = report_path.replace(".docx", "_traceability.json")
+        # 生成JSON文件路径(与报告同目录,只替换文件名后缀)
+        report_file = Path(report_path)
+        json_path = str(report_file.with_name(f"{report_file.stem}_traceability.json"))
 
         # 构建JSON数据
         traceability_data = {
             "company_name": company_name,
             "report_path": report_path,
             "generated_at": datetime.now().isoformat(),
-            "citations": [c.model_dump() for c in traceability_map]
+            "citations": traceability_map
         }
 
-        # 保存JSON
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(traceability_data, f, ensure_ascii=False, indent=2)
+        # 保存JSON; orjson 原生序列化 dataclass,标准库需先转换为字典
+        if orjson is not None:
+            Path(json_path).write_bytes(
+                orjson.dumps(traceability_data, option=orjson.OPT_INDENT_2)
+            )
+        else:
+            traceability_data["citations"] = [asdict(c) for c in traceability_map]
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(traceability_data, f, ensure_ascii=False, indent=2)
 
         return json_path
 
@@ -12,20 +12,138 @@ This module handles Word document template operations, including:
 根据 PROJECT_PLAN.md Phase 2.2 实现。
 """
 
+import functools
+import io
 import logging
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from copy import deepcopy
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 
 from docx import Document
-from docx.shared import Inches, Pt, RGBColor
+from docx.shared import Emu, Inches, Pt, RGBColor
+from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from docx.text.paragraph import Paragraph
+from docx.text.run import Run
 from docx.table import Table, _Cell
+from lxml.etree import SubElement
+
+try:
+    import ahocorasick  # optional: single-pass multi-text search (pyahocorasick)
+except ImportError:
+    ahocorasick = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Process-wide cache of template file contents keyed by (path, mtime_ns, size),
+# so batch generation reads each template from disk once
+_TEMPLATE_CACHE_SIZE = 4
+_templates: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_templates_lock = threading.Lock()
+
+# (stripped text, style name) per body paragraph of each cached template, filled
+# by the first handler that searches an unmodified document of that version
+_template_paragraphs: Dict[Tuple[str, int, int], List[Tuple[str, Optional[str]]]] = {}
+
+# Joins paragraph texts for substring search; NUL cannot occur in document text
+_TEXT_SEPARATOR = "\x00"
+
+# Write buffer used when saving documents
+_SAVE_BUFFER_SIZE = 1024 * 1024
+
+# Output directories already created in this process, so batch generation
+# skips the mkdir call for every report saved to the same directory
+_created_dirs: Set[Path] = set()
+_created_dirs_lock = threading.Lock()
+
+
+def _read_template(path: Path) -> Tuple[Tuple[str, int, int], bytes]:
+    """
+    Return the cache key and raw bytes of a template file, cached per file version.
+
+    Each handler still parses its own Document from the bytes: documents are
+    mutated during generation, and python-docx documents cannot be safely
+    deep-copied.
+    """
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    with _templates_lock:
+        if key in _templates:
+            _templates.move_to_end(key)
+            return key, _templates[key]
+
+    content = path.read_bytes()
+
+    with _templates_lock:
+        _templates[key] = content
+        while len(_templates) > _TEMPLATE_CACHE_SIZE:
+            evicted, _ = _templates.popitem(last=False)
+            _template_paragraphs.pop(evicted, None)
+    return key, content
+
+
+# Namespaced tag and attribute names used when building paragraphs and tables
+_W_TR = qn('w:tr')
+_W_TC = qn('w:tc')
+_W_P = qn('w:p')
+_W_R = qn('w:r')
+_W_GRID_COL = qn('w:gridCol')
+_W_W = qn('w:w')
+_W_PPR = qn('w:pPr')
+_W_PSTYLE = qn('w:pStyle')
+_W_VAL = qn('w:val')
+
+# Table-level properties written by document.add_table()
+_TBL_W_ATTRS = {qn('w:type'): 'auto', _W_W: '0'}
+_TBL_LOOK_ATTRS = {
+    qn('w:firstColumn'): '1', qn('w:firstRow'): '1',
+    qn('w:lastColumn'): '0', qn('w:lastRow'): '0',
+    qn('w:noHBand'): '0', qn('w:noVBand'): '1', qn('w:val'): '04A0',
+}
+
+
+def _make_borders_template() -> Any:
+    """Build the single-line black <w:tblBorders> element copied into bordered tables."""
+    tblBorders = OxmlElement('w:tblBorders')
+    for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+        SubElement(tblBorders, qn(f'w:{border_name}'), {
+            qn('w:val'): 'single',
+            qn('w:sz'): '4',  # Border size
+            qn('w:space'): '0',
+            qn('w:color'): '000000',  # Black
+        })
+    return tblBorders
+
+
+_BORDERS_TEMPLATE = _make_borders_template()
+
+
+def _bust_cache(method):
+    """
+    Decorator for methods that mutate the document: drop cached lookups.
+
+    Inside batch_edits() the lookups are only marked stale and dropped when
+    the outermost batch ends.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._pristine = False
+            if self._batch_depth:
+                self._dirty = True
+            else:
+                self._invalidate_caches()
+    return wrapper
+
 
 class WordTemplateHandler:
     """
@@ -46,6 +164,15 @@ class WordTemplateHandler:
         handler.save_document("output.docx")
     """
 
+    # Batch generation creates one handler per report; slots keep the many
+    # cache attributes compact
+    __slots__ = (
+        'template_path', '_document', '_template_key', '_pristine',
+        '_para_cache', '_text_index', '_style_index', '_index_by_element',
+        '_substring_hits', '_joined_text', '_text_offsets', '_text_memo',
+        '_batch_depth', '_dirty', '_styles', '_style_names',
+    )
+
     def __init__(self, template_path: str):
         """
         Initialize WordTemplateHandler.
@@ -61,12 +188,180 @@ class WordTemplateHandler:
         if not self.template_path.exists():
             raise FileNotFoundError(f"Template file not found: {self.template_path}")
 
-        logger.info(f"Loading Word template: {self.template_path}")
-        self.document = Document(str(self.template_path))
-        logger.info(f"Template loaded successfully. Contains {len(self.document.paragraphs)} paragraphs")
+        # Parsed on first access to self.document
+        self._document: Optional[Any] = None
+        self._template_key: Optional[Tuple[str, int, int]] = None
+        # True until the first insertion; an unmodified document can share the
+        # per-template paragraph texts and styles with other handlers
+        self._pristine = True
+
+        # (paragraph, stripped text, style name) per paragraph, built lazily on the
+        # first find: para.text walks every run, so repeated finds reuse this list.
+        # The text, style and position indexes are built alongside it. Invalidated by the
+        # insertion methods below; edits made directly through self.document
+        # are not tracked.
+        self._para_cache: Optional[List[Tuple[Paragraph, str, Optional[str]]]] = None
+        self._text_index: Dict[str, Paragraph] = {}
+        self._style_index: Dict[str, List[Tuple[Paragraph, str]]] = {}
+        self._index_by_element: Dict[Any, int] = {}
+        self._substring_hits: Dict[str, Optional[Paragraph]] = {}
+        self._joined_text: Optional[str] = None
+        self._text_offsets: List[int] = []
+        self._text_memo: Dict[Any, str] = {}
+        self._batch_depth = 0
+        self._dirty = False
+        # Style names in use, built on the first get_all_styles() call and then
+        # updated by each insertion rather than recomputed
+        self._styles: Optional[Set[str]] = None
+        self._style_names: Optional[Tuple[Dict[Optional[str], str], Optional[str]]] = None
+
+    @property
+    def document(self) -> Any:
+        """The python-docx Document, loaded from the template on first access."""
+        if self._document is None:
+            logger.info(f"Loading Word template: {self.template_path}")
+            self._template_key, content = _read_template(self.template_path)
+            self._document = Document(io.BytesIO(content))
+            logger.info(f"Template loaded successfully. Contains {len(self._document.paragraphs)} paragraphs")
+        return self._document
+
+    # ==================== Cache Management ====================
+
+    def _invalidate_caches(self) -> None:
+        """Drop all cached paragraph lookups; they are rebuilt on the next find."""
+        self._para_cache = None
+        self._text_memo = {}
+        self._dirty = False
+
+    @contextmanager
+    def batch_edits(self) -> Iterator["WordTemplateHandler"]:
+        """
+        Defer cache invalidation for a series of insertions.
+
+        Within the block, finds keep using the lookups from before the first
+        insertion: they see the original paragraphs (which stay valid insertion
+        points) but not newly inserted ones. The lookups are rebuilt once after
+        the outermost block exits, instead of after every insertion.
+
+        Usage:
+            with handler.batch_edits():
+                for text in texts:
+                    handler.insert_text_after(handler.find_paragraph_by_text("Purpose"), text)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._invalidate_caches()
 
     # ==================== Paragraph Position Finding ====================
 
+    def _ensure_cache(self) -> List[Tuple[Paragraph, str, Optional[str]]]:
+        """Return the cached paragraph list, building it and the indexes on first use."""
+        if self._para_cache is None:
+            # Walk the body's <w:p> children directly (the same paragraphs as
+            # document.paragraphs). An unmodified document reuses the texts and
+            # styles another handler extracted from the same template version;
+            # otherwise style names are resolved from the style ID instead of a
+            # per-paragraph Paragraph.style lookup
+            body = self.document._body
+            elements = list(body._element.iterchildren(_W_P))
+            shared = _template_paragraphs.get(self._template_key) if self._pristine else None
+
+            if shared is not None and len(shared) == len(elements):
+                self._para_cache = [
+                    (Paragraph(p, body), para_text, para_style)
+                    for p, (para_text, para_style) in zip(elements, shared)
+                ]
+            else:
+                style_names, default_style = self._paragraph_style_names()
+                self._para_cache = [
+                    (Paragraph(p, body), p.text.strip(), style_names.get(p.style, default_style))
+                    for p in elements
+                ]
+                if self._pristine:
+                    shared = [(para_text, para_style) for _, para_text, para_style in self._para_cache]
+                    with _templates_lock:
+                        # Skip templates already evicted from the bytes cache
+                        if self._template_key in _templates:
+                            _template_paragraphs[self._template_key] = shared
+
+            # Both indexes keep document order; the text index keeps the first
+            # paragraph for duplicate texts, as the linear scan did
+            text_index: Dict[str, Paragraph] = {}
+            style_index: Dict[str, List[Tuple[Paragraph, str]]] = defaultdict(list)
+            for para, para_text, para_style in self._para_cache:
+                text_index.setdefault(para_text, para)
+                if para_style is not None:
+                    style_index[para_style].append((para, para_text))
+            self._text_index = text_index
+            self._style_index = dict(style_index)
+
+            # Keyed by the XML element, since python-docx hands out a new
+            # Paragraph wrapper on every access
+            self._index_by_element = {
+                para._element: index for index, (para, _, _) in enumerate(self._para_cache)
+            }
+            self._substring_hits = {}
+            self._joined_text = None
+        return self._para_cache
+
+    def _find_substring(self, text: str) -> Optional[Paragraph]:
+        """
+        Return the first paragraph whose stripped text contains text.
+
+        Searches all paragraph texts joined into one string with a single
+        str.find and maps the hit back through the recorded start offsets.
+        """
+        paragraphs = self._ensure_cache()
+        if _TEXT_SEPARATOR in text:
+            # A match could span paragraphs; check them one by one
+            return next((para for para, para_text, _ in paragraphs if text in para_text), None)
+
+        if self._joined_text is None:
+            offsets = []
+            offset = 0
+            for _, para_text, _ in paragraphs:
+                offsets.append(offset)
+                offset += len(para_text) + len(_TEXT_SEPARATOR)
+            self._joined_text = _TEXT_SEPARATOR.join(para_text for _, para_text, _ in paragraphs)
+            self._text_offsets = offsets
+
+        pos = self._joined_text.find(text)
+        if pos < 0 or not paragraphs:
+            return None
+        return paragraphs[bisect_right(self._text_offsets, pos) - 1][0]
+
+    def _paragraph_style_names(self) -> Tuple[Dict[Optional[str], str], Optional[str]]:
+        """
+        Map paragraph style IDs to style names, plus the default style name.
+
+        Mirrors Paragraph.style: a missing or unknown style ID (or one that is not
+        a paragraph style) resolves to the document's default paragraph style.
+        """
+        if self._style_names is None:
+            styles = self.document.styles
+            names: Dict[Optional[str], str] = {
+                style.style_id: style.name
+                for style in styles
+                if style.type == WD_STYLE_TYPE.PARAGRAPH
+            }
+            default = styles.default(WD_STYLE_TYPE.PARAGRAPH)
+            self._style_names = (names, default.name if default is not None else None)
+        return self._style_names
+
+    def _text_of(self, para: Paragraph) -> str:
+        """Return a paragraph's stripped text, reusing the paragraph cache when possible."""
+        element = para._element
+        text = self._text_memo.get(element)
+        if text is None:
+            index = self._index_by_element.get(element) if self._para_cache is not None else None
+            text = self._para_cache[index][1] if index is not None else para.text.strip()
+            self._text_memo[element] = text
+        return text
+
     def find_paragraph_by_text(
         self,
         text: str,
@@ -84,21 +379,70 @@ class WordTemplateHandler:
         """
         logger.debug(f"Searching for paragraph with text: '{text}' (exact_match={exact_match})")
 
-        for para in self.document.paragraphs:
-            para_text = para.text.strip()
-
-            if exact_match:
-                if para_text == text:
-                    logger.debug(f"Found exact match: '{para_text}'")
-                    return para
-            else:
-                if text in para_text:
-                    logger.debug(f"Found substring match: '{para_text}'")
-                    return para
+        self._ensure_cache()
+
+        if exact_match:
+            para = self._text_index.get(text)
+            if para is not None:
+                logger.debug(f"Found exact match: '{text}'")
+                return para
+        else:
+            # Repeated substring searches for the same text reuse the first scan
+            if text not in self._substring_hits:
+                self._substring_hits[text] = self._find_substring(text)
+            para = self._substring_hits[text]
+            if para is not None:
+                logger.debug(f"Found substring match for: '{text}'")
+                return para
 
         logger.warning(f"Paragraph not found with text: '{text}'")
         return None
 
+    def find_paragraphs_by_texts(self, texts: List[str]) -> Dict[str, Paragraph]:
+        """
+        Find the first paragraph containing each of several texts (substring match).
+
+        Equivalent to calling find_paragraph_by_text(text, exact_match=False) per
+        text. Uses an Aho-Corasick automaton that sweeps the document once when
+        pyahocorasick is installed, one str.find over the joined paragraph
+        texts per text otherwise.
+
+        Args:
+            texts: Texts to search for (empty strings are ignored)
+
+        Returns:
+            Dict mapping each found text to its first containing paragraph;
+            texts that were not found are absent
+        """
+        wanted = list(dict.fromkeys(t for t in texts if t))
+        logger.debug(f"Searching for {len(wanted)} texts in one pass")
+
+        found: Dict[str, Paragraph] = {}
+        if not wanted:
+            return found
+
+        paragraphs = self._ensure_cache()
+
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for text in wanted:
+                automaton.add_word(text, text)
+            automaton.make_automaton()
+
+            for para, para_text, _ in paragraphs:
+                for _, hit in automaton.iter(para_text):
+                    found.setdefault(hit, para)
+                if len(found) == len(wanted):
+                    break
+        else:
+            for text in wanted:
+                para = self._find_substring(text)
+                if para is not None:
+                    found[text] = para
+
+        logger.debug(f"Found {len(found)} of {len(wanted)} texts")
+        return found
+
     def find_paragraphs_by_style(self, style: str) -> List[Paragraph]:
         """
         Find all paragraphs with a specific style.
@@ -111,11 +455,8 @@ class WordTemplateHandler:
         """
         logger.debug(f"Searching for paragraphs with style: '{style}'")
 
-        matching_paragraphs = []
-
-        for para in self.document.paragraphs:
-            if para.style and para.style.name == style:
-                matching_paragraphs.append(para)
+        self._ensure_cache()
+        matching_paragraphs = [para for para, _ in self._style_index.get(style, ())]
 
         logger.debug(f"Found {len(matching_paragraphs)} paragraphs with style '{style}'")
         return matching_paragraphs
@@ -141,22 +482,17 @@ class WordTemplateHandler:
         """
         logger.debug(f"Searching for paragraph with text '{text}' and style '{style}'")
 
-        for para in self.document.paragraphs:
-            para_text = para.text.strip()
-            para_style = para.style.name if para.style else None
+        self._ensure_cache()
 
-            # Check style match
-            if para_style != style:
-                continue
-
-            # Check text match
+        # Only paragraphs of the requested style need a text check
+        for para, para_text in self._style_index.get(style, ()):
             if exact_match:
                 if para_text == text:
-                    logger.debug(f"Found match: '{para_text}' with style '{para_style}'")
+                    logger.debug(f"Found match: '{para_text}' with style '{style}'")
                     return para
             else:
                 if text in para_text:
-                    logger.debug(f"Found match: '{para_text}' with style '{para_style}'")
+                    logger.debug(f"Found match: '{para_text}' with style '{style}'")
                     return para
 
         logger.warning(f"Paragraph not found with text '{text}' and style '{style}'")
@@ -164,6 +500,7 @@ class WordTemplateHandler:
 
     # ==================== Text Insertion ====================
 
+    @_bust_cache
     def insert_text_after(
         self,
         position: Paragraph,
@@ -181,26 +518,49 @@ class WordTemplateHandler:
         Returns:
             The newly created paragraph
         """
-        logger.debug(f"Inserting text after paragraph: '{position.text[:50]}...'")
+        new_para, _ = self._insert_text_after(position, text, preserve_style)
+        return new_para
 
-        # Create new paragraph using OxmlElement
+    def _insert_text_after(
+        self,
+        position: Paragraph,
+        text: str,
+        preserve_style: bool
+    ) -> Tuple[Paragraph, Optional[Run]]:
+        """Insert text after a paragraph; returns the new paragraph and its run (None if no text)."""
+        logger.debug(f"Inserting text after paragraph: '{self._text_of(position)[:50]}...'")
+
+        # Resolve the style python-docx would write when copying position.style:
+        # no pStyle for the default style or for IDs that resolve to it
+        style_id = position._element.style if preserve_style else None
+        style_names, default_style = self._paragraph_style_names()
+        style_name = style_names.get(style_id)
+        if style_name == default_style:
+            style_id = style_name = None
+
+        # Build the complete paragraph, then insert it with a single addnext
         new_para_element = OxmlElement('w:p')
-        position._element.addnext(new_para_element)
-
-        # Create a Paragraph object from the element
-        new_para = Paragraph(new_para_element, position._parent)
+        if style_name is not None:
+            pPr = SubElement(new_para_element, _W_PPR)
+            SubElement(pPr, _W_PSTYLE, {_W_VAL: style_id})
+            logger.debug(f"Applied style: {style_name}")
 
-        # Add text to the new paragraph
+        run_element = None
         if text:
-            new_para.add_run(text)
+            run_element = SubElement(new_para_element, _W_R)
+            # CT_R.text handles tabs, line breaks and whitespace preservation
+            run_element.text = text
 
-        # Preserve style if requested
-        if preserve_style and position.style:
-            new_para.style = position.style
-            logger.debug(f"Applied style: {position.style.name}")
+        position._element.addnext(new_para_element)
+        new_para = Paragraph(new_para_element, position._parent)
+        run = Run(run_element, new_para) if run_element is not None else None
 
-        return new_para
+        if new_para_element.getparent() is self.document.element.body:
+            self._add_used_style(style_name)
+
+        return new_para, run
 
+    @_bust_cache
     def insert_formatted_text(
         self,
         position: Paragraph,
@@ -229,10 +589,10 @@ class WordTemplateHandler:
         logger.debug(f"Inserting formatted text: bold={bold}, italic={italic}, underline={underline}")
 
         # Insert paragraph
-        new_para = self.insert_text_after(position, text, preserve_style=False)
+        new_para, run = self._insert_text_after(position, text, preserve_style=False)
 
-        # Apply formatting to all runs in the paragraph
-        for run in new_para.runs:
+        # Apply formatting to the run just created
+        if run is not None:
             if bold:
                 run.bold = True
             if italic:
@@ -248,6 +608,7 @@ class WordTemplateHandler:
 
     # ==================== Table Insertion ====================
 
+    @_bust_cache
     def insert_table_after(
         self,
         position: Paragraph,
@@ -261,7 +622,7 @@ class WordTemplateHandler:
 
         Args:
             position: Paragraph to insert after
-            rows: Number of rows
+            rows: Number of rows (extended to fit data if it has more rows)
             cols: Number of columns
             data: Optional table data (list of rows, each row is a list of cell values)
             style_config: Optional styling configuration dict with keys:
@@ -274,93 +635,87 @@ class WordTemplateHandler:
         """
         logger.debug(f"Inserting table: {rows}x{cols}")
 
-        # Create table
-        table = self.document.add_table(rows=rows, cols=cols)
-
-        # Move table to correct position (after the specified paragraph)
-        position._element.addnext(table._element)
-
-        # Fill data if provided
-        if data:
-            self._fill_table_data(table, data)
+        tbl = self._build_table_element(rows, cols, data or [], style_config or {})
 
-        # Apply styling if provided
-        if style_config:
-            self._apply_table_style(table, style_config)
+        # Insert the finished table after the specified paragraph
+        position._element.addnext(tbl)
+        table = Table(tbl, position._parent)
 
         logger.debug(f"Table inserted successfully: {rows}x{cols}")
         return table
 
-    def _fill_table_data(self, table: Table, data: List[List[str]]) -> None:
-        """Fill table with data."""
-        for row_idx, row_data in enumerate(data):
-            if row_idx >= len(table.rows):
-                # Add new row if needed
-                table.add_row()
-
-            row = table.rows[row_idx]
+    def _build_table_element(
+        self,
+        rows: int,
+        cols: int,
+        data: List[List[Any]],
+        style_config: Dict[str, Any]
+    ) -> Any:
+        """
+        Build the complete <w:tbl> element, including data and styling, in one pass.
 
-            for col_idx, cell_value in enumerate(row_data):
-                if col_idx < len(row.cells):
-                    row.cells[col_idx].text = str(cell_value) if cell_value is not None else ""
+        Produces the same markup as document.add_table() followed by filling and
+        styling each cell through python-docx, without walking the table again
+        for every cell.
+        """
+        # Same column width as document.add_table(): text block width split evenly
+        col_width = Emu(self.document._block_width // cols) if cols > 0 else Emu(0)
+        col_twips = str(col_width.twips)
 
-    def _apply_table_style(self, table: Table, style_config: Dict[str, Any]) -> None:
-        """Apply styling to table."""
-        # Apply header formatting
-        if style_config.get('header_bold', False):
-            header_row = table.rows[0]
-            for cell in header_row.cells:
-                for para in cell.paragraphs:
-                    for run in para.runs:
-                        run.bold = True
-
-        # Apply header background color
-        if 'header_background' in style_config:
-            header_color = style_config['header_background']
-            self._set_row_background_color(table.rows[0], header_color)
-
-        # Apply borders
+        tbl = OxmlElement('w:tbl')
+        tblPr = SubElement(tbl, qn('w:tblPr'))
+        SubElement(tblPr, qn('w:tblW'), _TBL_W_ATTRS)
         if style_config.get('border', False):
-            self._set_table_borders(table)
-
-    def _set_row_background_color(self, row, color_hex: str) -> None:
-        """Set background color for a table row."""
-        for cell in row.cells:
-            # Access cell shading element
-            shading_elm = OxmlElement('w:shd')
-            shading_elm.set(qn('w:fill'), color_hex)
-            cell._element.get_or_add_tcPr().append(shading_elm)
-
-    def _set_table_borders(self, table: Table) -> None:
-        """Add borders to table."""
-        # This is simplified - in production, you might want more control
-        tbl = table._element
-        tblPr = tbl.tblPr
-        if tblPr is None:
-            tblPr = OxmlElement('w:tblPr')
-            tbl.insert(0, tblPr)
-
-        # Add table borders element
-        tblBorders = OxmlElement('w:tblBorders')
-        for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-            border = OxmlElement(f'w:{border_name}')
-            border.set(qn('w:val'), 'single')
-            border.set(qn('w:sz'), '4')  # Border size
-            border.set(qn('w:space'), '0')
-            border.set(qn('w:color'), '000000')  # Black
-            tblBorders.append(border)
-
-        tblPr.append(tblBorders)
+            tblPr.append(deepcopy(_BORDERS_TEMPLATE))
+        SubElement(tblPr, qn('w:tblLook'), _TBL_LOOK_ATTRS)
+
+        tblGrid = SubElement(tbl, qn('w:tblGrid'))
+        for _ in range(cols):
+            SubElement(tblGrid, _W_GRID_COL, {_W_W: col_twips})
+
+        # Cell properties and header run properties are built once and copied per cell
+        body_tcPr = OxmlElement('w:tcPr')
+        SubElement(body_tcPr, qn('w:tcW'), {qn('w:type'): 'dxa', _W_W: col_twips})
+        header_tcPr = body_tcPr
+        header_color = style_config.get('header_background')
+        if header_color is not None:
+            header_tcPr = deepcopy(body_tcPr)
+            SubElement(header_tcPr, qn('w:shd'), {qn('w:fill'): header_color})
+
+        header_rPr = None
+        if style_config.get('header_bold', False):
+            header_rPr = OxmlElement('w:rPr')
+            SubElement(header_rPr, qn('w:b'))
+
+        for row_idx in range(max(rows, len(data))):
+            row_data = data[row_idx] if row_idx < len(data) else ()
+            is_header = row_idx == 0
+            tcPr = header_tcPr if is_header else body_tcPr
+
+            tr = SubElement(tbl, _W_TR)
+            for col_idx in range(cols):
+                tc = SubElement(tr, _W_TC)
+                tc.append(deepcopy(tcPr))
+
+                p = SubElement(tc, _W_P)
+                if col_idx < len(row_data):
+                    r = SubElement(p, _W_R)
+                    if is_header and header_rPr is not None:
+                        r.append(deepcopy(header_rPr))
+                    cell_value = row_data[col_idx]
+                    # CT_R.text handles tabs, line breaks and whitespace preservation
+                    r.text = "" if cell_value is None else str(cell_value)
+
+        return tbl
 
     # ==================== Helper Methods ====================
 
     def _get_paragraph_index(self, paragraph: Paragraph) -> Optional[int]:
         """Get the index of a paragraph in the document."""
-        try:
-            return self.document.paragraphs.index(paragraph)
-        except ValueError:
-            return None
+        self._ensure_cache()
+        return self._index_by_element.get(paragraph._element)
 
+    @_bust_cache
     def _insert_paragraph_at_index(self, index: int, text: str = "") -> Paragraph:
         """
         Insert a new paragraph at a specific index.
@@ -379,6 +734,7 @@ class WordTemplateHandler:
             target_para._element.addprevious(new_para._element)
         # If index is at the end, paragraph is already in the right place
 
+        self._add_used_style(None)
         return new_para
 
     # ==================== Document Save ====================
@@ -391,14 +747,36 @@ class WordTemplateHandler:
             output_path: Path to save the document
         """
         output_file = Path(output_path)
+        parent = output_file.parent
 
         # Create output directory if it doesn't exist
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with _created_dirs_lock:
+            known_dir = parent in _created_dirs
+        if not known_dir:
+            self._make_output_dir(parent)
 
         logger.info(f"Saving document to: {output_file}")
-        self.document.save(str(output_file))
+        try:
+            f = open(output_file, 'wb', buffering=_SAVE_BUFFER_SIZE)
+        except FileNotFoundError:
+            if not known_dir:
+                raise
+            # The directory was removed since it was created; create it again
+            self._make_output_dir(parent)
+            f = open(output_file, 'wb', buffering=_SAVE_BUFFER_SIZE)
+
+        # A large buffer turns the zip writer's many small writes into few syscalls
+        with f:
+            self.document.save(f)
         logger.info("Document saved successfully")
 
+    @staticmethod
+    def _make_output_dir(directory: Path) -> None:
+        """Create an output directory and remember it for later saves."""
+        directory.mkdir(parents=True, exist_ok=True)
+        with _created_dirs_lock:
+            _created_dirs.add(directory)
+
     # ==================== Utility Methods ====================
 
     def get_paragraph_count(self) -> int:
@@ -407,8 +785,25 @@ class WordTemplateHandler:
 
     def get_all_styles(self) -> List[str]:
         """Get a list of all styles used in the document."""
-        styles = set()
-        for para in self.document.paragraphs:
-            if para.style:
-                styles.add(para.style.name)
-        return sorted(list(styles))
+        if self._styles is None:
+            if self._dirty:
+                # Lookups are stale inside batch_edits(); read the document itself
+                style_names, default_style = self._paragraph_style_names()
+                self._styles = {
+                    style_names.get(p.style, default_style)
+                    for p in self.document.element.body.iterchildren(_W_P)
+                }
+                self._styles.discard(None)
+            else:
+                self._ensure_cache()
+                self._styles = set(self._style_index)
+        return sorted(self._styles)
+
+    def _add_used_style(self, style_name: Optional[str]) -> None:
+        """Record the style of a newly inserted body paragraph (None: default style)."""
+        if self._styles is None:
+            return
+        if style_name is None:
+            style_name = self._paragraph_style_names()[1]
+        if style_name is not None:
+            self._styles.add(style_name)
@@ -3,19 +3,101 @@
 提供数据一致性验证、可追溯性验证和AI幻觉检测功能
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 import re
+from bisect import bisect_left, bisect_right
+
+try:
+    import ahocorasick  # 可选: 多模式子串匹配(pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
 from .models import (
     ReportData,
     ImpactMechanism,
     CitationInfo,
     ValidationResult,
-    ValidationError
+    ValidationError,
+    DATACLASS_SLOTS
 )
 
 
-@dataclass
+# 从生成内容中提取的数值
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+# 句子分隔符: 中文句号及英文 . ! ? ;
+_SENTENCE_SPLIT_RE = re.compile(r'[。.!?;]\s*')
+
+# 按句提取数值时在整段内容上使用: '.' 本身是句子分隔符,句内不存在小数部分
+_SENTENCE_NUMBER_RE = re.compile(r'\b\d+\b')
+
+# 拼接多段文本做一次子串查找时使用的分隔符(不会出现在正常文本中)
+_TEXT_SEPARATOR = "\x00"
+
+
+def _build_automaton(words: List[str]) -> Any:
+    """构建 Aho-Corasick 自动机,值为该词在 words 中的所有下标; 无可用词时返回None"""
+    automaton = ahocorasick.Automaton()
+    for index, word in enumerate(words):
+        if not word:
+            continue
+        if automaton.exists(word):
+            automaton.get(word).append(index)
+        else:
+            automaton.add_word(word, [index])
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+def _words_found_in(words: List[str], texts: List[str]) -> Set[int]:
+    """
+    返回至少出现在一段文本中的词的下标集合
+
+    等价于 {i for i, w in enumerate(words) if any(w in t for t in texts)},
+    但每段文本只扫描一次(有 pyahocorasick 时),或对拼接文本做一次子串查找。
+    """
+    if not texts:
+        return set()
+
+    if ahocorasick is not None:
+        # 空串出现在任何文本中
+        found = {index for index, word in enumerate(words) if not word}
+        automaton = _build_automaton(words)
+        if automaton is not None:
+            for text in texts:
+                for _, indexes in automaton.iter(text):
+                    found.update(indexes)
+        return found
+
+    joined = _TEXT_SEPARATOR.join(texts)
+    return {
+        index for index, word in enumerate(words)
+        if (word in joined if _TEXT_SEPARATOR not in word else any(word in t for t in texts))
+    }
+
+
+def _texts_containing_any(words: List[str], texts: List[str]) -> List[bool]:
+    """逐段文本判断是否包含任一词(words 中不应含空串)"""
+    if ahocorasick is not None:
+        automaton = _build_automaton(words)
+        if automaton is None:
+            return [False] * len(texts)
+        return [next(automaton.iter(text), None) is not None for text in texts]
+
+    return [any(word in text for word in words) for text in texts]
+
+
+def _split_into_sentences(text: str) -> List[str]:
+    """将文本分割为句子"""
+    # 简单的句子分割(可以改进)
+    stripped = (s.strip() for s in _SENTENCE_SPLIT_RE.split(text))
+    return [s for s in stripped if s]
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ConsistencyCheckResult:
     """一致性检查结果"""
     is_consistent: bool
@@ -23,7 +105,7 @@ class ConsistencyCheckResult:
     checked_values: Dict[str, List[Any]]
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class TraceabilityCheckResult:
     """可追溯性检查结果"""
     total_values: int
@@ -32,7 +114,7 @@ class TraceabilityCheckResult:
     untraceable_items: List[str]
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class HallucinationCheckResult:
     """幻觉检测结果"""
     total_statements: int
@@ -79,27 +161,32 @@ class DataConsistencyValidator:
                 })
         
         # 2. 验证数值一致性(从影响机制中提取)
+        # 同名键以最后一个机制为准(与逐个机制重置列表的结果一致)
+        mechanism_values = {}
         for mechanism in report_data.impact_data.mechanisms:
             if mechanism.value is not None:
                 value_key = f"value_{mechanism.stakeholder_affected}_{mechanism.mechanism}"
                 checked_values[value_key] = []
-                
-                # 在生成内容中查找该数值
-                for section, content in generated_content.items():
-                    # 查找数值(支持不同格式: 123, 123.45, 123,456等)
-                    value_pattern = re.escape(str(mechanism.value))
-                    if re.search(value_pattern, content):
-                        checked_values[value_key].append({
-                            'section': section,
-                            'value': mechanism.value
-                        })
+                mechanism_values[value_key] = mechanism.value
+        
+        # 转义后的数值模式只匹配字面值,等价于子串查找; 每个章节对所有数值只查找一次
+        value_keys = list(mechanism_values)
+        value_texts = [str(mechanism_values[key]) for key in value_keys]
+        for section, content in generated_content.items():
+            for index in sorted(_words_found_in(value_texts, [content])):
+                value_key = value_keys[index]
+                checked_values[value_key].append({
+                    'section': section,
+                    'value': mechanism_values[value_key]
+                })
         
         # 3. 检查是否有不一致的情况
         for key, occurrences in checked_values.items():
             if len(occurrences) > 1:
                 # 检查所有出现的值是否一致
-                values = [occ['value'] for occ in occurrences]
-                if len(set(str(v) for v in values)) > 1:
+                # 按字符串形式比较(1 和 1.0 视为不一致),遇到第一个不同值即停止
+                first = str(occurrences[0]['value'])
+                if any(str(occ['value']) != first for occ in occurrences[1:]):
                     inconsistencies.append(
                         f"数值 '{key}' 在不同章节中不一致: {occurrences}"
                     )
@@ -139,7 +226,7 @@ class DataConsistencyValidator:
         # 在生成内容中查找数值
         for section, content in generated_content.items():
             # 使用正则表达式提取所有数值
-            numbers = re.findall(r'\b\d+(?:\.\d+)?\b', content)
+            numbers = _NUMBER_RE.findall(content)
             
             for num_str in numbers:
                 try:
@@ -215,24 +302,24 @@ class TraceabilityValidator:
         
         total_values = len(source_items)
         
-        # 检查每个源项是否有对应的引用
+        # 检查每个源项是否有对应的引用(一次性在所有引用陈述中查找全部源项)
         traceable_count = 0
         untraceable_items = []
+        # 每个源项只转换一次字符串,查找与未追溯项记录共用
+        item_texts = [str(item) for item in source_items]
+        traceable_indexes = _words_found_in(
+            item_texts,
+            [citation.statement for citation in citations]
+        )
         
-        for item in source_items:
-            # 检查是否在citations中
-            is_traceable = any(
-                str(item) in citation.statement
-                for citation in citations
-            )
-            
-            if is_traceable:
+        for index, (item, item_text) in enumerate(zip(source_items, item_texts)):
+            if index in traceable_indexes:
                 traceable_count += 1
             else:
                 # 某些项可能不需要引用(如公司名称在标题中)
                 # 只标记重要的未追溯项
-                if isinstance(item, (int, float)) or len(str(item)) > 50:
-                    untraceable_items.append(str(item)[:100])
+                if isinstance(item, (int, float)) or len(item_text) > 50:
+                    untraceable_items.append(item_text[:100])
         
         traceability_rate = traceable_count / total_values if total_values > 0 else 0
         
@@ -280,17 +367,19 @@ class TraceabilityValidator:
             if mechanism.value is not None:
                 source_texts.append(str(mechanism.value))
         
+        # 源数据关键信息只需筛选和转小写一次
+        # (简单的包含检查,可以改进为更复杂的语义匹配)
+        source_keys = [
+            str(source_text).lower() for source_text in source_texts
+            if len(str(source_text)) > 5
+        ]
+        grounded_flags = _texts_containing_any(
+            source_keys,
+            [statement.lower() for statement in statements]
+        )
+        
         # 检查每个陈述是否有数据支撑
-        for statement in statements:
-            is_grounded = False
-            
-            # 检查陈述中是否包含源数据的关键信息
-            for source_text in source_texts:
-                # 简单的包含检查(可以改进为更复杂的语义匹配)
-                if len(str(source_text)) > 5 and str(source_text).lower() in statement.lower():
-                    is_grounded = True
-                    break
-            
+        for statement, is_grounded in zip(statements, grounded_flags):
             if is_grounded:
                 grounded_count += 1
             else:
@@ -318,6 +407,10 @@ class HallucinationDetector:
             r'研究表明',
             r'专家认为',
         ]
+        # 合并为一个分组交替式,每个句子只扫描一次; 命中的组名对应模式序号
+        self._hallucination_re = re.compile('|'.join(
+            f'(?P<p{i}>{pattern})' for i, pattern in enumerate(self.hallucination_patterns)
+        ))
     
     def detect_hallucinations(
         self,
@@ -337,32 +430,34 @@ class HallucinationDetector:
         hallucinations = []
         total_statements = 0
         
-        # 构建源数据关键词集合
-        source_keywords = self._extract_keywords_from_data(report_data)
+        # 源数据数值排序后按二分查找比对,每份报告只构建一次
+        source_values = sorted(
+            mechanism.value for mechanism in report_data.impact_data.mechanisms
+            if mechanism.value is not None
+        )
         
         for section, content in generated_content.items():
-            # 将内容分割为句子
-            sentences = self._split_into_sentences(content)
+            # 将内容分割为句子,并一次性提取各句中的数值
+            sentences = self._split_with_numbers(content)
             total_statements += len(sentences)
             
-            for sentence in sentences:
+            for sentence, numbers in sentences:
                 # 检查是否包含幻觉模式
-                for pattern in self.hallucination_patterns:
-                    if re.search(pattern, sentence):
-                        hallucinations.append({
-                            'section': section,
-                            'sentence': sentence[:200],
-                            'reason': f'包含可疑短语: {pattern}'
-                        })
-                        break
+                match = self._hallucination_re.search(sentence)
+                if match:
+                    pattern = self.hallucination_patterns[int(match.lastgroup[1:])]
+                    hallucinations.append({
+                        'section': section,
+                        'sentence': sentence[:200],
+                        'reason': f'包含可疑短语: {pattern}'
+                    })
                 
                 # 检查是否包含不在源数据中的具体数值或事实
                 # (这里简化处理,实际应该更复杂)
-                numbers = re.findall(r'\b\d+(?:\.\d+)?\b', sentence)
                 for num_str in numbers:
                     try:
                         num = float(num_str)
-                        if num > 10 and not self._is_number_in_source(num, report_data):
+                        if num > 10 and not self._is_number_in_source(num, source_values):
                             hallucinations.append({
                                 'section': section,
                                 'sentence': sentence[:200],
@@ -399,28 +494,32 @@ class HallucinationDetector:
         """
         issues = []
         
+        # 源数据按类型拆分一次: 数值排序后二分比对,字符串仅在数值未命中时做子串查找
+        # (NaN 与任何数都不接近,排除以保持有序)
+        source_values = sorted(
+            value for value in source_data.values()
+            if isinstance(value, (int, float)) and value == value
+        )
+        source_texts = [value for value in source_data.values() if isinstance(value, str)]
+        
         # 1. 检查关键事实是否来自源数据
-        sentences = self._split_into_sentences(generated_text)
+        sentences = _split_into_sentences(generated_text)
         
         for sentence in sentences:
             # 提取句子中的关键信息
             # (简化处理,实际应该使用NLP技术)
             
             # 检查数值
-            numbers = re.findall(r'\b\d+(?:\.\d+)?\b', sentence)
+            numbers = _NUMBER_RE.findall(sentence)
             for num_str in numbers:
                 try:
                     num = float(num_str)
                     if num > 10:  # 忽略小数字
                         # 检查该数值是否在源数据中
-                        found = False
-                        for key, value in source_data.items():
-                            if isinstance(value, (int, float)) and abs(value - num) < 0.01:
-                                found = True
-                                break
-                            elif isinstance(value, str) and num_str in value:
-                                found = True
-                                break
+                        found = (
+                            self._is_number_in_source(num, source_values)
+                            or any(num_str in value for value in source_texts)
+                        )
                         
                         if not found:
                             issues.append(f"数值 {num} 未在源数据中找到: {sentence[:100]}")
@@ -448,18 +547,49 @@ class HallucinationDetector:
         
         return keywords
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """将文本分割为句子"""
-        # 简单的句子分割(可以改进)
-        sentences = re.split(r'[。.!?;]\s*', text)
-        return [s.strip() for s in sentences if s.strip()]
+    def _split_with_numbers(self, text: str) -> List[Tuple[str, List[str]]]:
+        """
+        将文本分割为句子,同时给出每句中的数值字符串
+
+        结果与 _split_into_sentences 加逐句 _NUMBER_RE.findall 相同,
+        但数值只在整段文本上匹配一次,再按句子起始位置归入各句。
+        """
+        starts = []
+        pieces = []
+        start = 0
+        for match in _SENTENCE_SPLIT_RE.finditer(text):
+            starts.append(start)
+            pieces.append(text[start:match.start()])
+            start = match.end()
+        starts.append(start)
+        pieces.append(text[start:])
+        
+        numbers: List[List[str]] = [[] for _ in pieces]
+        for match in _SENTENCE_NUMBER_RE.finditer(text):
+            numbers[bisect_right(starts, match.start()) - 1].append(match.group())
+        
+        result = []
+        for piece, piece_numbers in zip(pieces, numbers):
+            sentence = piece.strip()
+            if sentence:
+                result.append((sentence, piece_numbers))
+        return result
     
-    def _is_number_in_source(self, number: float, report_data: ReportData) -> bool:
-        """检查数值是否在源数据中"""
-        for mechanism in report_data.impact_data.mechanisms:
-            if mechanism.value is not None and abs(mechanism.value - number) < 0.01:
-                return True
-        return False
+    def _is_number_in_source(self, number: float, source_values: List[float]) -> bool:
+        """
+        检查数值是否在源数据中(误差小于0.01)
+
+        Args:
+            number: 待检查的数值
+            source_values: 已排序的源数据数值
+        """
+        # 最接近的源数值只可能是插入点两侧的相邻元素
+        index = bisect_left(source_values, number)
+        return any(
+            abs(source_values[i] - number) < 0.01
+            for i in (index - 1, index)
+            if 0 <= i < len(source_values)
+        )
 
 
 class ValidationReportGenerator:
@@ -7,6 +7,7 @@ Unit tests for AITextGenerator.
 3. Grounding验证
 4. Token使用统计
 5. Prompt构建
+6. 流式生成
 
 使用Mock避免实际API调用
 """
@@ -20,7 +21,10 @@ from src.ai_generator import (
     APIConfig,
     GroundingResult,
     TokenUsage,
-    create_generator_from_config
+    create_generator_from_config,
+    _compile_template,
+    _retry_after_seconds,
+    _wait_for_retry
 )
 from src.models import GenerationResult
 
@@ -102,6 +106,53 @@ class TestAPICall:
         assert "Data:" in prompt
         # 复杂对象会被转换为字符串
 
+    def test_prompt_building_single_pass(self, ai_generator):
+        """测试未提供的占位符保持原样,且替换值不会被再次展开"""
+        prompt = ai_generator._build_prompt(
+            template="{a} / {b} / {missing} / {\"json\": 1}",
+            data={"a": "{b}", "b": "B"}
+        )
+
+        assert prompt == "{b} / B / {missing} / {\"json\": 1}"
+
+    def test_prompt_template_compiled_once(self, ai_generator):
+        """测试同一模板在多次构建间复用预拆分结果"""
+        template = "Company: {name} ({sector})"
+        _compile_template.cache_clear()
+
+        first = ai_generator._build_prompt(template, {"name": "A", "sector": "Tech"})
+        second = ai_generator._build_prompt(template, {"name": "B", "sector": "Food"})
+
+        assert first == "Company: A (Tech)"
+        assert second == "Company: B (Food)"
+        assert _compile_template.cache_info().misses == 1
+        assert _compile_template.cache_info().hits == 1
+
+    def test_static_prefix_sent_as_cached_system_block(self, ai_generator):
+        """测试静态指令前缀作为可缓存的system块发送"""
+        ai_generator.generate_text(
+            prompt_template="Write an analysis.\nRules: be factual.\nCompany: {company}\n",
+            data={"company": "EmergConnect"},
+            validate_grounding=False
+        )
+
+        kwargs = ai_generator.client.messages.create.call_args.kwargs
+        assert kwargs["system"][0]["text"] == "Write an analysis.\nRules: be factual.\n"
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert kwargs["messages"][0]["content"] == "Company: EmergConnect\n"
+
+    def test_prompt_without_static_prefix_not_split(self, ai_generator):
+        """测试无静态前缀时整段Prompt作为用户消息"""
+        ai_generator.generate_text(
+            prompt_template="Describe {company}",
+            data={"company": "EmergConnect"},
+            validate_grounding=False
+        )
+
+        kwargs = ai_generator.client.messages.create.call_args.kwargs
+        assert "system" not in kwargs
+        assert kwargs["messages"][0]["content"] == "Describe EmergConnect"
+
     def test_token_usage_calculation(self, ai_generator):
         """测试Token使用统计"""
         result = ai_generator.generate_text(
@@ -137,6 +188,7 @@ class TestAPICall:
         assert total.input_tokens == 200  # 100 * 2
         assert total.output_tokens == 100  # 50 * 2
         assert total.total_tokens == 300
+        assert ai_generator.get_total_usage_dict() == total.model_dump()
 
     def test_reset_usage(self, ai_generator):
         """测试重置统计"""
@@ -152,6 +204,25 @@ class TestAPICall:
         assert total.input_tokens == 0
         assert total.output_tokens == 0
 
+    def test_total_usage_returned_as_snapshot(self, ai_generator):
+        """测试get_total_usage返回TokenUsage快照,不随后续调用变化"""
+        ai_generator.generate_text(
+            prompt_template="Test",
+            data={},
+            validate_grounding=False
+        )
+        snapshot = ai_generator.get_total_usage()
+
+        ai_generator.generate_text(
+            prompt_template="Test",
+            data={},
+            validate_grounding=False
+        )
+
+        assert isinstance(snapshot, TokenUsage)
+        assert snapshot.total_tokens == 150
+        assert ai_generator.get_total_usage().total_tokens == 300
+
 
 # ==================== 错误处理测试 ====================
 
@@ -261,6 +332,148 @@ class TestErrorHandling:
             # 不重试,只调用1次
             assert mock_client.messages.create.call_count == 1
 
+    def test_retry_after_header_respected(self):
+        """测试重试等待不短于服务端返回的Retry-After"""
+        error = Exception("Rate limit")
+        error.response = MagicMock(headers={"retry-after": "12"})
+
+        retry_state = MagicMock(attempt_number=1)
+        retry_state.outcome.exception.return_value = error
+
+        assert _retry_after_seconds(error) == 12.0
+        assert _wait_for_retry(retry_state) >= 12.0
+
+    def test_retry_after_ms_header_preferred(self):
+        """测试优先使用毫秒精度的retry-after-ms头"""
+        error = Exception("Rate limit")
+        error.response = MagicMock(headers={"retry-after-ms": "1500", "retry-after": "2"})
+
+        assert _retry_after_seconds(error) == 1.5
+
+    def test_backoff_without_retry_after(self):
+        """测试无Retry-After时使用有上限的随机退避"""
+        retry_state = MagicMock(attempt_number=3)
+        retry_state.outcome.exception.return_value = Exception("Timeout")
+
+        assert 0 <= _wait_for_retry(retry_state) <= 30
+
+
+# ==================== 上下文窗口检查测试 ====================
+
+class TestContextWindow:
+    """测试调用前的上下文窗口检查"""
+
+    def test_short_prompt_skips_token_count(self, ai_generator):
+        """测试明显未超限的Prompt不调用计数接口"""
+        ai_generator.generate_text(
+            prompt_template="Describe {company}",
+            data={"company": "EmergConnect"},
+            validate_grounding=False
+        )
+
+        ai_generator.client.messages.count_tokens.assert_not_called()
+        ai_generator.client.messages.create.assert_called_once()
+
+    def test_oversized_prompt_rejected_before_call(self, ai_generator):
+        """测试超出上下文窗口的Prompt在调用API前失败"""
+        ai_generator.config.context_window = 2000
+        ai_generator.client.messages.count_tokens.return_value = MagicMock(input_tokens=1500)
+
+        result = ai_generator.generate_text(
+            prompt_template="{text}",
+            data={"text": "word " * 1000},
+            validate_grounding=False
+        )
+
+        assert result.success is False
+        assert "Prompt too long" in result.validation_errors[0]
+        ai_generator.client.messages.count_tokens.assert_called_once()
+        ai_generator.client.messages.create.assert_not_called()
+
+    def test_estimate_over_but_count_within_limit(self, ai_generator):
+        """测试估算偏高但精确计数未超限时正常调用"""
+        ai_generator.config.context_window = 2000
+        ai_generator.client.messages.count_tokens.return_value = MagicMock(input_tokens=900)
+
+        result = ai_generator.generate_text(
+            prompt_template="{text}",
+            data={"text": "word " * 1000},
+            validate_grounding=False
+        )
+
+        assert result.success is True
+        ai_generator.client.messages.create.assert_called_once()
+
+
+# ==================== 流式生成测试 ====================
+
+def _stream_events(chunks, input_tokens=100, output_tokens=50):
+    """构造Claude流式事件序列"""
+    events = [MagicMock(type="message_start", message=MagicMock(
+        usage=MagicMock(input_tokens=input_tokens)
+    ))]
+    events += [MagicMock(type="text", text=chunk) for chunk in chunks]
+    events.append(MagicMock(type="message_delta", usage=MagicMock(output_tokens=output_tokens)))
+    return events
+
+
+class TestStreaming:
+    """测试流式生成"""
+
+    def test_stream_yields_chunks_and_result(self, ai_generator):
+        """测试逐片段产出文本,迭代结束后提供完整结果"""
+        stream = ai_generator.client.messages.stream.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter(_stream_events(["Emerg", "Connect ", "helps."]))
+
+        text_stream = ai_generator.generate_text_stream(
+            prompt_template="Describe {company}",
+            data={"company": "EmergConnect"},
+            validate_grounding=False
+        )
+        chunks = list(text_stream)
+
+        assert chunks == ["Emerg", "Connect ", "helps."]
+        assert text_stream.result.success is True
+        assert text_stream.result.metrics["generated_text"] == "EmergConnect helps."
+        assert text_stream.result.metrics["token_usage"]["total_tokens"] == 150
+
+    def test_stream_aborts_on_ungrounded_number(self, ai_generator):
+        """测试完整输出的数值不在源数据中时提前终止"""
+        events = _stream_events(["Serves 12", "0 users and 99", "9 more", " text"])
+        stream = ai_generator.client.messages.stream.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter(events)
+
+        text_stream = ai_generator.generate_text_stream(
+            prompt_template="Describe {company}",
+            data={"company": "TestCo"},
+            source_data={"company_name": "TestCo", "users": 120},
+            abort_on_hallucination=True
+        )
+        chunks = list(text_stream)
+
+        # "120" 被跨片段拼接后识别为有效数值, "999" 触发终止
+        assert chunks == ["Serves 12", "0 users and 99", "9 more"]
+        assert "Generation aborted" in text_stream.result.validation_errors[0]
+        assert "'999'" in text_stream.result.validation_errors[0]
+
+    def test_stream_close_releases_api_stream(self, ai_generator):
+        """测试提前关闭流时结束API请求"""
+        stream_context = ai_generator.client.messages.stream.return_value
+        stream = stream_context.__enter__.return_value
+        stream.__iter__.return_value = iter(_stream_events(["Emerg", "Connect ", "helps."]))
+
+        with ai_generator.generate_text_stream(
+            prompt_template="Describe {company}",
+            data={"company": "EmergConnect"},
+            validate_grounding=False
+        ) as text_stream:
+            chunks = iter(text_stream)
+            assert next(chunks) == "Emerg"
+            stream_context.__exit__.assert_not_called()
+
+        stream_context.__exit__.assert_called_once()
+        assert text_stream.result is None
+
 
 # ==================== Grounding验证测试 ====================
 
@@ -301,6 +514,31 @@ class TestGroundingValidation:
         assert grounding.is_grounded is False
         assert len(grounding.hallucinations) > 0
 
+    def test_grounding_matches_whole_numbers_only(self, ai_generator):
+        """测试数值按完整数值匹配: 不再因子串命中,等值的小数写法可匹配"""
+        grounding = ai_generator.validate_grounding(
+            generated_text="Founded in 2020 with 100.0 staff and 5 offices.",
+            source_data={"company_name": "TestCo", "founded": 2020, "staff": "100"}
+        )
+
+        assert grounding.hallucinations == [
+            "Numerical value '5' not found in source data"
+        ]
+
+    def test_grounding_batch_matches_single_validation(self, ai_generator):
+        """测试批量验证与逐条验证结果一致,且源数据只提取一次"""
+        source_data = {"company_name": "TestCo", "employees": 50}
+        texts = ["TestCo has 50 employees.", "TestCo has 999 employees."]
+
+        with patch.object(
+            AITextGenerator, '_source_numbers', wraps=AITextGenerator._source_numbers
+        ) as mock_source_numbers:
+            results = ai_generator.validate_grounding_batch(texts, source_data)
+
+        assert mock_source_numbers.call_count == 1
+        assert [r.is_grounded for r in results] == [True, False]
+        assert results[1] == ai_generator.validate_grounding(texts[1], source_data)
+
     def test_grounding_with_empty_source_data(self, ai_generator):
         """测试空源数据的Grounding验证"""
         grounding = ai_generator.validate_grounding(
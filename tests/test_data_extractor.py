@@ -7,12 +7,15 @@ Tests cover:
 - Schema validation (Task 2.1.17)
 """
 
+import os
+import shutil
 import pytest
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 from src.data_extractor import DataExtractor
-from src.models import SDGResponse, CompanyImpactData, ValidationResult
+from src.models import SDGResponse, CompanyImpactData, ImpactMechanism, ValidationResult
 
 
 # Test fixtures
@@ -181,6 +184,18 @@ class TestImpactMechanismsExtraction:
         assert hasattr(mech, 'value'), "Should have value"
         assert hasattr(mech, 'unit'), "Should have unit"
 
+    def test_trusted_mechanisms_pass_validation(self, extractor):
+        """Test mechanisms built without validation are valid ImpactMechanism rows."""
+        # Act
+        companies_data = extractor.extract_impact_mechanisms(
+            filename="影响评估机制_完整中文版.xlsx"
+        )
+
+        # Assert
+        for company in companies_data:
+            for mech in company.mechanisms:
+                assert ImpactMechanism.model_validate(mech.model_dump()) == mech
+
     def test_extract_impact_mechanisms_value_parsing(self, extractor):
         """Test that value field is correctly parsed as float."""
         # Act
@@ -227,6 +242,194 @@ class TestImpactMechanismsExtraction:
         assert companies_data[0].company_name == "EmergConnect", \
             "Company name should match"
 
+    def test_trailing_blank_rows_not_read(self, extractor):
+        """Test reading stops after a run of empty rows past the data."""
+        # Arrange
+        blank = (None,) * 8
+        data_row = ("Employees", "Training") + (None,) * 6
+        consumed = []
+
+        def iter_rows(**kwargs):
+            for row in [data_row] * 15 + [blank] * 5 + [data_row] + [blank] * 1000:
+                consumed.append(row)
+                yield row
+
+        worksheet = type("FakeSheet", (), {"iter_rows": staticmethod(iter_rows)})()
+
+        # Act
+        rows = extractor._read_company_rows(worksheet)
+
+        # Assert
+        assert len(rows) == 21, "Short gaps are kept, trailing blanks dropped"
+        assert len(consumed) == 21 + DataExtractor.MAX_EMPTY_ROWS
+
+
+# ==================== Company Listing Tests ====================
+
+class TestCompanyListing:
+    """Test company name fast paths."""
+
+    def test_list_impact_company_names_matches_extraction(self, extractor):
+        """Test sheet-name listing matches the fully extracted companies."""
+        # Act
+        names = extractor.list_impact_company_names()
+        companies_data = extractor.extract_impact_mechanisms()
+
+        # Assert
+        assert names == [c.company_name for c in companies_data]
+        assert "Template sheet" not in names
+
+    def test_list_sdg_company_names(self, extractor):
+        """Test SDG company names are unique and non-empty."""
+        # Act
+        names = extractor.list_sdg_company_names()
+        responses = extractor.extract_sdg_questionnaire()
+
+        # Assert
+        assert len(names) == len(set(names))
+        assert all(names)
+        assert set(names) <= {r.company_name for r in responses}
+
+
+# ==================== Excel Backend Tests ====================
+
+class TestExcelBackends:
+    """Test the calamine reader matches openpyxl's output."""
+
+    def test_calamine_matches_openpyxl(self, data_dir):
+        """Test both readers extract identical data."""
+        pytest.importorskip("python_calamine")
+        pytest.importorskip("openpyxl")
+        extractor = DataExtractor(str(data_dir), cache_dir=None)
+
+        def extract_all():
+            DataExtractor.clear_cache()
+            return (
+                [r.model_dump() for r in extractor.extract_sdg_questionnaire()],
+                [c.model_dump() for c in extractor.extract_impact_mechanisms()],
+            )
+
+        # Act
+        with_calamine = extract_all()
+        with patch("src.data_extractor.CalamineWorkbook", None):
+            with_openpyxl = extract_all()
+        DataExtractor.clear_cache()
+
+        # Assert
+        assert with_calamine == with_openpyxl
+
+    def test_unvalidated_rows_match_validated(self, data_dir):
+        """Test validate_rows=False builds the same models without validation."""
+        def extract_all(validate_rows):
+            DataExtractor.clear_cache()
+            extractor = DataExtractor(str(data_dir), cache_dir=None, validate_rows=validate_rows)
+            return (
+                [r.model_dump() for r in extractor.extract_sdg_questionnaire()],
+                [c.model_dump() for c in extractor.extract_impact_mechanisms()],
+            )
+
+        # Act
+        validated = extract_all(True)
+        constructed = extract_all(False)
+        DataExtractor.clear_cache()
+
+        # Assert
+        assert constructed == validated
+
+
+# ==================== Extraction Cache Tests ====================
+
+class TestExtractionCache:
+    """Test memoized and disk-cached extraction results."""
+
+    @pytest.fixture
+    def cached_extractor(self, data_dir, tmp_path):
+        """Extractor over a private copy of the data with its own cache dir."""
+        local_data = tmp_path / "data"
+        local_data.mkdir()
+        shutil.copy(data_dir / "影响评估机制_完整中文版.xlsx", local_data)
+
+        DataExtractor.clear_cache()
+        yield DataExtractor(str(local_data), cache_dir=str(tmp_path / "cache"))
+        DataExtractor.clear_cache()
+
+    def test_repeat_extraction_skips_parsing(self, cached_extractor):
+        """Test a second extraction is served from the in-process memo."""
+        # Arrange
+        first = cached_extractor.extract_impact_mechanisms()
+
+        # Act
+        with patch.object(DataExtractor, "_open_excel") as mock_open:
+            second = cached_extractor.extract_impact_mechanisms()
+
+        # Assert
+        mock_open.assert_not_called()
+        assert second == first
+        assert second is not first, "Callers should get their own list"
+
+    def test_disk_cache_reused_across_processes(self, cached_extractor):
+        """Test a fresh process (empty memo) loads the JSON cache instead of parsing."""
+        # Arrange
+        first = cached_extractor.extract_impact_mechanisms()
+        DataExtractor.clear_cache()
+
+        # Act
+        with patch.object(DataExtractor, "_open_excel") as mock_open:
+            second = cached_extractor.extract_impact_mechanisms()
+
+        # Assert
+        mock_open.assert_not_called()
+        assert [c.model_dump() for c in second] == [c.model_dump() for c in first]
+
+    def test_disk_cache_disabled_by_default(self, data_dir, tmp_path, monkeypatch):
+        """Test no cache files are written unless cache_dir is given."""
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        DataExtractor.clear_cache()
+        extractor = DataExtractor(str(data_dir))
+
+        # Act
+        extractor.extract_impact_mechanisms()
+        DataExtractor.clear_cache()
+
+        # Assert
+        assert extractor.cache_dir is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_modified_file_is_reparsed(self, cached_extractor):
+        """Test changing the file's mtime invalidates the cache."""
+        # Arrange
+        cached_extractor.extract_impact_mechanisms()
+        path = cached_extractor.data_dir / "影响评估机制_完整中文版.xlsx"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        # Act
+        with patch.object(
+            DataExtractor, "_open_excel", wraps=cached_extractor._open_excel
+        ) as mock_open:
+            cached_extractor.extract_impact_mechanisms()
+
+        # Assert
+        mock_open.assert_called_once()
+
+    def test_workbook_opened_once_per_file_version(self, cached_extractor):
+        """Test the open workbook is shared until the file changes."""
+        # Arrange
+        filename = "影响评估机制_完整中文版.xlsx"
+        first = cached_extractor._open_excel(filename)
+
+        # Act
+        second = cached_extractor._open_excel(filename)
+        path = cached_extractor.data_dir / filename
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        reopened = cached_extractor._open_excel(filename)
+
+        # Assert
+        assert second is first
+        assert reopened is not first
+
 
 # ==================== Task 2.1.17: Schema Validation Tests ====================
 
@@ -0,0 +1,318 @@
+"""
+Unit tests for LLMCache.
+
+测试覆盖:
+1. 缓存键的确定性
+2. 缓存读写和持久化
+3. 实体槽位抽象和回填
+4. AITextGenerator 命中缓存时跳过API调用
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.llm_cache import LLMCache
+from src.ai_generator import AITextGenerator, APIConfig
+
+
+# ==================== Fixtures ====================
+
+@pytest.fixture
+def cache(tmp_path):
+    """测试用缓存(临时目录)"""
+    cache = LLMCache(str(tmp_path / "llm_cache"))
+    yield cache
+    cache.close()
+
+
+# ==================== 缓存键测试 ====================
+
+class TestCacheKey:
+    """测试缓存键计算"""
+
+    def test_same_inputs_same_key(self):
+        """测试相同输入生成相同的键"""
+        key1 = LLMCache.make_key("claude-sonnet-4-5", "prompt", 0.0, 1000)
+        key2 = LLMCache.make_key("claude-sonnet-4-5", "prompt", 0.0, 1000)
+
+        assert key1 == key2
+
+    def test_different_params_different_key(self):
+        """测试生成参数不同时键不同"""
+        base = LLMCache.make_key("claude-sonnet-4-5", "prompt", 0.0, 1000)
+
+        assert base != LLMCache.make_key("gpt-4o-mini", "prompt", 0.0, 1000)
+        assert base != LLMCache.make_key("claude-sonnet-4-5", "other", 0.0, 1000)
+        assert base != LLMCache.make_key("claude-sonnet-4-5", "prompt", 0.3, 1000)
+        assert base != LLMCache.make_key("claude-sonnet-4-5", "prompt", 0.0, 500)
+
+
+# ==================== 读写测试 ====================
+
+class TestCacheStorage:
+    """测试缓存读写"""
+
+    def test_miss_returns_none(self, cache):
+        """测试未命中返回None"""
+        assert cache.get("missing") is None
+
+    def test_set_and_get(self, cache):
+        """测试写入后可读取"""
+        cache.set("key", "生成的内容", {"input_tokens": 10})
+
+        text, usage = cache.get("key")
+        assert text == "生成的内容"
+        assert usage == {"input_tokens": 10}
+
+    def test_persists_across_instances(self, tmp_path):
+        """测试缓存跨实例持久化"""
+        cache_dir = str(tmp_path / "persist")
+        first = LLMCache(cache_dir)
+        first.set("key", "text", {})
+        first.close()
+
+        second = LLMCache(cache_dir)
+        assert second.get("key") == ("text", {})
+        second.close()
+
+
+# ==================== 槽位抽象测试 ====================
+
+class TestSlotAbstraction:
+    """测试实体槽位抽象"""
+
+    def test_abstract_and_fill_roundtrip(self):
+        """测试抽象后回填得到另一实体的文本"""
+        abstracted = LLMCache.abstract_slots(
+            "EmergConnect服务社区。EmergConnect很重要。",
+            {"company_name": "EmergConnect"}
+        )
+
+        assert "EmergConnect" not in abstracted
+        assert LLMCache.fill_slots(abstracted, {"company_name": "Cloudshelf"}) == \
+            "Cloudshelf服务社区。Cloudshelf很重要。"
+
+    def test_short_values_not_abstracted(self):
+        """测试过短的槽位值不做替换"""
+        assert LLMCache.abstract_slots("A plan", {"company_name": "A"}) == "A plan"
+
+    def test_value_inside_longer_word_not_abstracted(self):
+        """测试只替换完整词,嵌在更长单词中的值保持原样"""
+        slots = {"company_name": "Net"}
+        abstracted = LLMCache.abstract_slots("Net builds a Network", slots)
+
+        assert abstracted == "⟦company_name⟧ builds a Network"
+        assert LLMCache.fill_slots(abstracted, {"company_name": "Cloudshelf"}) == \
+            "Cloudshelf builds a Network"
+
+    def test_response_with_embedded_value_not_abstracted(self):
+        """测试实体值嵌在更长的词中时,生成结果不以槽位形式缓存"""
+        slots = {"company_name": "Net"}
+
+        assert LLMCache.abstract_response("Net serves NetCo users", slots) is None
+        assert LLMCache.abstract_response("Net serves users", slots) == \
+            "⟦company_name⟧ serves users"
+
+
+# ==================== 生成器集成测试 ====================
+
+class TestGeneratorCaching:
+    """测试AITextGenerator使用缓存"""
+
+    def test_cache_hit_skips_api(self, tmp_path, monkeypatch):
+        """测试相同Prompt第二次生成时不调用API"""
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "gen_cache"))
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Cached content")]
+        mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
+        mock_client.messages.create.return_value = mock_response
+
+        config = APIConfig(
+            endpoint="https://test.api.com",
+            api_key="test-key",
+            temperature=0.0
+        )
+
+        with patch('src.ai_generator.Anthropic', return_value=mock_client):
+            generator = AITextGenerator(config)
+
+        first = generator.generate_text("Describe {name}", {"name": "TestCo"},
+                                        validate_grounding=False)
+        second = generator.generate_text("Describe {name}", {"name": "TestCo"},
+                                         validate_grounding=False)
+
+        assert mock_client.messages.create.call_count == 1
+        assert second.metrics["generated_text"] == first.metrics["generated_text"]
+        assert second.metrics["token_usage"]["total_tokens"] == 0
+
+    def test_slot_hit_across_companies(self, tmp_path, monkeypatch):
+        """测试仅公司名不同的Prompt命中缓存并回填公司名"""
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "slot_cache"))
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="TestCo serves its community.")]
+        mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
+        mock_client.messages.create.return_value = mock_response
+
+        config = APIConfig(
+            endpoint="https://test.api.com",
+            api_key="test-key",
+            temperature=0.0
+        )
+
+        with patch('src.ai_generator.Anthropic', return_value=mock_client):
+            generator = AITextGenerator(config)
+
+        generator.generate_text("Describe {company_name}", {"company_name": "TestCo"},
+                                validate_grounding=False)
+        result = generator.generate_text("Describe {company_name}", {"company_name": "OtherCo"},
+                                         validate_grounding=False)
+
+        assert mock_client.messages.create.call_count == 1
+        assert result.metrics["generated_text"] == "OtherCo serves its community."
+
+    def test_truncated_response_not_cached(self, tmp_path, monkeypatch):
+        """测试达到max_tokens的输出不写入缓存"""
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "trunc_cache"))
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Cut off mid")]
+        mock_response.usage = MagicMock(input_tokens=100, output_tokens=1000)
+        mock_client.messages.create.return_value = mock_response
+
+        config = APIConfig(
+            endpoint="https://test.api.com",
+            api_key="test-key",
+            temperature=0.0,
+            max_tokens=1000
+        )
+
+        with patch('src.ai_generator.Anthropic', return_value=mock_client):
+            generator = AITextGenerator(config)
+
+        for _ in range(2):
+            generator.generate_text("Describe {name}", {"name": "TestCo"},
+                                    validate_grounding=False)
+
+        assert mock_client.messages.create.call_count == 2
+
+    def test_cache_disabled_by_default(self, monkeypatch):
+        """测试非零温度且未设置LLM_CACHE时不启用缓存"""
+        monkeypatch.delenv("LLM_CACHE", raising=False)
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        config = APIConfig(
+            endpoint="https://test.api.com",
+            api_key="test-key",
+            temperature=0.3
+        )
+
+        with patch('src.ai_generator.Anthropic', return_value=MagicMock()):
+            generator = AITextGenerator(config)
+
+        assert generator.cache is None
+
+
+# ==================== 批处理预取测试 ====================
+
+class TestBatchPrefetch:
+    """测试通过批处理接口预取生成结果"""
+
+    def test_claude_batch_results_served_from_cache(self, tmp_path, monkeypatch):
+        """测试批处理结果写入缓存,随后生成不再调用实时API"""
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "batch_cache"))
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        mock_client = MagicMock()
+        mock_client.messages.batches.create.return_value = MagicMock(
+            id="batch-1", processing_status="ended"
+        )
+
+        def batch_results(batch_id):
+            for custom_id in ("req-0", "req-1"):
+                entry = MagicMock(custom_id=custom_id)
+                entry.result.type = "succeeded"
+                entry.result.message.content = [MagicMock(text="Batch content")]
+                entry.result.message.usage = MagicMock(input_tokens=100, output_tokens=50)
+                yield entry
+
+        mock_client.messages.batches.results.side_effect = batch_results
+
+        config = APIConfig(
+            endpoint="https://test.api.com",
+            api_key="test-key",
+            temperature=0.3
+        )
+
+        with patch('src.ai_generator.Anthropic', return_value=mock_client):
+            generator = AITextGenerator(config)
+
+        requests = [
+            ("Describe {name}", {"name": "TestCo"}),
+            ("Summarize {name}", {"name": "TestCo"}),
+            ("Describe {name}", {"name": "TestCo"}),
+        ]
+        fetched = generator.prefetch_batch(requests, poll_interval=0)
+
+        submitted = mock_client.messages.batches.create.call_args.kwargs["requests"]
+        assert fetched == 2
+        assert len(submitted) == 2
+        assert generator.get_total_usage().estimated_cost == pytest.approx(
+            2 * (0.1 * 0.003 + 0.05 * 0.015) * AITextGenerator.BATCH_DISCOUNT
+        )
+
+        result = generator.generate_text("Describe {name}", {"name": "TestCo"},
+                                         validate_grounding=False)
+
+        assert result.metrics["generated_text"] == "Batch content"
+        mock_client.messages.create.assert_not_called()
+
+    def test_truncated_batch_result_not_cached(self, tmp_path, monkeypatch):
+        """测试达到max_tokens的批处理结果不写入缓存,但仍计入Token统计"""
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "batch_trunc_cache"))
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        mock_client = MagicMock()
+        mock_client.messages.batches.create.return_value = MagicMock(
+            id="batch-1", processing_status="ended"
+        )
+
+        entry = MagicMock(custom_id="req-0")
+        entry.result.type = "succeeded"
+        entry.result.message.content = [MagicMock(text="Cut off mid")]
+        entry.result.message.usage = MagicMock(input_tokens=100, output_tokens=1000)
+        mock_client.messages.batches.results.return_value = iter([entry])
+
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Live content")]
+        mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
+        mock_client.messages.create.return_value = mock_response
+
+        config = APIConfig(
+            endpoint="https://test.api.com",
+            api_key="test-key",
+            temperature=0.3,
+            max_tokens=1000
+        )
+
+        with patch('src.ai_generator.Anthropic', return_value=mock_client):
+            generator = AITextGenerator(config)
+
+        fetched = generator.prefetch_batch([("Describe {name}", {"name": "TestCo"})],
+                                           poll_interval=0)
+
+        assert fetched == 0
+        assert generator.get_total_usage().output_tokens == 1000
+
+        result = generator.generate_text("Describe {name}", {"name": "TestCo"},
+                                         validate_grounding=False)
+
+        assert result.metrics["generated_text"] == "Live content"
+        mock_client.messages.create.assert_called_once()
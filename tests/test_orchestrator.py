@@ -106,6 +106,13 @@ class TestTemplateConfig:
         assert len(rules) == 4  # 配置文件中有4条规则
         assert rules[0].name == "Company Overview"
 
+    def test_get_insert_rule_by_name(self, config_path):
+        """测试按名称获取插入规则"""
+        config = TemplateConfig(config_path)
+
+        assert config.get_insert_rule_by_name("Company Overview") is config.get_insert_rules()[0]
+        assert config.get_insert_rule_by_name("Missing Rule") is None
+
     def test_get_output_filename(self, config_path):
         """测试生成输出文件名"""
         config = TemplateConfig(config_path)
@@ -115,6 +122,43 @@ class TestTemplateConfig:
         assert "20240101" in filename
         assert filename.endswith(".docx")
 
+    def test_unvalidated_load_matches_validated(self, config_path):
+        """测试跳过校验构建的规则与完整校验结果一致"""
+        validated = TemplateConfig(config_path)
+        constructed = TemplateConfig(config_path, validate=False)
+
+        assert [rule.model_dump() for rule in constructed.get_insert_rules()] == \
+            [rule.model_dump() for rule in validated.get_insert_rules()]
+
+    def test_invalid_rule_skipped(self, config_path, tmp_path):
+        """测试无效规则被跳过,其余规则仍正常加载"""
+        import yaml
+
+        raw = yaml.safe_load(Path(config_path).read_text(encoding="utf-8"))
+        del raw["insert_rules"][1]["data_source"]
+        path = tmp_path / "template_mapping.yaml"
+        path.write_text(yaml.safe_dump(raw, allow_unicode=True), encoding="utf-8")
+
+        config = TemplateConfig(str(path))
+
+        assert len(config.get_insert_rules()) == 3
+        assert config.get_insert_rules()[0].name == "Company Overview"
+
+    def test_load_reuses_instance_until_file_changes(self, config_path, tmp_path):
+        """测试load在文件未变化时复用实例,修改后重新解析"""
+        path = tmp_path / "template_mapping.yaml"
+        path.write_text(Path(config_path).read_text(encoding="utf-8"), encoding="utf-8")
+
+        first = TemplateConfig.load(str(path))
+        assert TemplateConfig.load(str(path)) is first
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        reloaded = TemplateConfig.load(str(path))
+        assert reloaded is not first
+        assert len(reloaded.get_insert_rules()) == len(first.get_insert_rules())
+
 
 # ==================== ReportOrchestrator基础测试 ====================
 
@@ -232,6 +276,55 @@ class TestHelperMethods:
         assert found is not None
         assert found.company_name == "TestCompany"
 
+    @patch('src.orchestrator.DataExtractor')
+    @patch('src.orchestrator.AITextGenerator')
+    def test_find_prefers_exact_match(
+        self,
+        mock_ai_generator,
+        mock_data_extractor,
+        config_path,
+        api_config,
+        sample_sdg_response
+    ):
+        """测试精确匹配优先于包含匹配"""
+        orchestrator = ReportOrchestrator(
+            data_dir=".",
+            config_path=config_path,
+            api_config=api_config
+        )
+
+        fuzzy = sample_sdg_response.model_copy(update={"company_name": "TestCompany Ltd"})
+        responses = [fuzzy, sample_sdg_response]
+
+        assert orchestrator._find_sdg_response(responses, "testcompany") is sample_sdg_response
+        assert orchestrator._find_sdg_response(list(responses), "Ltd") is fuzzy
+        assert orchestrator._find_sdg_response(responses, "Other") is None
+
+    @patch('src.orchestrator.DataExtractor')
+    @patch('src.orchestrator.AITextGenerator')
+    def test_sdg_matched_through_mechanism_name(
+        self,
+        mock_ai_generator,
+        mock_data_extractor_class,
+        config_path,
+        api_config,
+        sample_sdg_response,
+        sample_impact_data
+    ):
+        """测试SDG名字被包含在Mechanism全名中时仍能匹配"""
+        sdg = sample_sdg_response.model_copy(update={"company_name": "Sparkinity"})
+        impact = sample_impact_data.model_copy(update={"company_name": "公司B/Sparkinity"})
+        mock_data_extractor_class.return_value.extract_sdg_questionnaire.return_value = [sdg]
+        mock_data_extractor_class.return_value.extract_impact_mechanisms.return_value = [impact]
+
+        orchestrator = ReportOrchestrator(
+            data_dir=".",
+            config_path=config_path,
+            api_config=api_config
+        )
+
+        assert orchestrator._load_company_data("公司B") == (sdg, impact)
+
     @patch('src.orchestrator.DataExtractor')
     @patch('src.orchestrator.AITextGenerator')
     def test_fill_template(
@@ -256,6 +349,113 @@ class TestHelperMethods:
         assert "Company: TestCo" in result
         assert "Type: Tech" in result
 
+        # 未提供的键保留原样,填入值中的占位符不再被替换
+        result = orchestrator._fill_template(
+            "{name} / {missing}", {"name": "{type}", "type": "Tech"}
+        )
+        assert result == "{type} / {missing}"
+
+    @patch('src.orchestrator.DataExtractor')
+    @patch('src.orchestrator.AITextGenerator')
+    def test_after_section_scans_style_once(
+        self,
+        mock_ai_generator,
+        mock_data_extractor,
+        config_path,
+        api_config
+    ):
+        """测试同一样式的 after_section 查找只扫描一次文档"""
+        from src.config_loader import InsertPosition
+
+        orchestrator = ReportOrchestrator(
+            data_dir=".",
+            config_path=config_path,
+            api_config=api_config
+        )
+        intro, results = MagicMock(text="Introduction"), MagicMock(text="Results")
+        orchestrator.template_handler = MagicMock()
+        orchestrator.template_handler.find_paragraphs_by_style.return_value = [intro, results]
+
+        def find(text):
+            return orchestrator._find_insert_position(InsertPosition(
+                method="after_section", target_text=text, target_style="Heading 1"
+            ))
+
+        assert find("Results") is results
+        assert find("Intro") is intro
+        assert find("Missing") is None
+        orchestrator.template_handler.find_paragraphs_by_style.assert_called_once_with(
+            style="Heading 1"
+        )
+
+    @patch('src.orchestrator.DataExtractor')
+    @patch('src.orchestrator.AITextGenerator')
+    def test_process_table_rule(
+        self,
+        mock_ai_generator,
+        mock_data_extractor,
+        config_path,
+        api_config,
+        sample_impact_data
+    ):
+        """测试表格规则按列格式化机制数据并记录引用"""
+        orchestrator = ReportOrchestrator(
+            data_dir=".",
+            config_path=config_path,
+            api_config=api_config
+        )
+        orchestrator.template_handler = MagicMock()
+        rule = next(
+            r for r in orchestrator.config.get_insert_rules()
+            if r.content_type == "structured_table"
+        )
+        rule = rule.model_copy(deep=True)
+        rule.table_config.columns[-1].field = "not_a_field"
+
+        citations = orchestrator._process_table_rule(rule, MagicMock(), sample_impact_data)
+
+        table_data = orchestrator.template_handler.insert_table_after.call_args.kwargs["data"]
+        assert table_data == [
+            ["Stakeholder", "Mechanism", "Type", "Value", "Unit"],
+            ["Employees", "Training programs", "Positive", "100.00", ""],
+        ]
+        assert [c.source_sheet for c in citations] == ["TestCompany"]
+
+    @patch('src.orchestrator.DataExtractor')
+    @patch('src.orchestrator.AITextGenerator')
+    def test_save_traceability_json(
+        self,
+        mock_ai_generator,
+        mock_data_extractor,
+        config_path,
+        api_config,
+        tmp_path
+    ):
+        """测试可追溯性JSON包含全部引用字段"""
+        import json
+        from dataclasses import asdict
+        from src.models import CitationInfo
+
+        orchestrator = ReportOrchestrator(
+            data_dir=".",
+            config_path=config_path,
+            api_config=api_config
+        )
+        citation = CitationInfo(statement="影响评估", source_file="Mechanisms.xlsx", source_row=14)
+
+        report_dir = tmp_path / "reports.docx"
+        report_dir.mkdir()
+        json_path = orchestrator._save_traceability_json(
+            "TestCo", [citation], str(report_dir / "report.docx")
+        )
+
+        assert json_path == str(report_dir / "report_traceability.json")
+
+        with open(json_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        assert saved["company_name"] == "TestCo"
+        assert saved["citations"] == [asdict(citation)]
+
 
 # ==================== 完整流程测试(Mock) ====================
 
@@ -330,6 +530,69 @@ class TestReportGenerationMocked:
         mock_data_extractor.extract_impact_mechanisms.assert_called_once()
         mock_template_handler.save_document.assert_called_once()
 
+        # 编排器可复用,Token统计在每份报告开始时重置
+        mock_ai_generator.reset_usage.assert_called_once()
+
+    @patch('src.orchestrator.WordTemplateHandler')
+    @patch('src.orchestrator.DataExtractor')
+    @patch('src.orchestrator.AITextGenerator')
+    def test_ai_rules_generated_concurrently_inserted_in_order(
+        self,
+        mock_ai_generator_class,
+        mock_data_extractor_class,
+        mock_template_handler_class,
+        config_path,
+        api_config,
+        sample_sdg_response,
+        sample_impact_data,
+        tmp_path
+    ):
+        """测试多条AI规则并发生成,按规则顺序插入文档"""
+        mock_data_extractor = MagicMock()
+        mock_data_extractor.extract_sdg_questionnaire.return_value = [sample_sdg_response]
+        mock_data_extractor.extract_impact_mechanisms.return_value = [sample_impact_data]
+        mock_data_extractor_class.return_value = mock_data_extractor
+
+        def generate_text(prompt_template, **kwargs):
+            result = MagicMock(success=True, traceability_map=[], validation_errors=[])
+            result.metrics = {"generated_text": f"text for {prompt_template}"}
+            return result
+
+        mock_ai_generator = MagicMock()
+        mock_ai_generator.generate_text.side_effect = generate_text
+        mock_ai_generator.get_total_usage.return_value = MagicMock(estimated_cost=0.0)
+        mock_ai_generator_class.return_value = mock_ai_generator
+
+        mock_template_handler = MagicMock()
+        mock_template_handler.find_paragraph_by_text_and_style.return_value = MagicMock()
+        mock_template_handler.document.paragraphs = [MagicMock()]
+        mock_template_handler_class.return_value = mock_template_handler
+
+        orchestrator = ReportOrchestrator(
+            data_dir=".",
+            config_path=config_path,
+            api_config=api_config,
+            base_dir=os.getcwd()
+        )
+        # 使用独立的配置实例,避免修改 TemplateConfig.load 共享的缓存实例
+        orchestrator.config = TemplateConfig(config_path)
+        rules = orchestrator.config.get_insert_rules()
+        ai_rule = next(r for r in rules if r.content_type == "ai_generated")
+        rules.append(ai_rule.model_copy(update={"name": "Second", "prompt_template": "second"}))
+
+        result = orchestrator.generate_report(
+            company_name="TestCompany",
+            output_path=str(tmp_path / "report.docx")
+        )
+
+        assert result.success is True
+        assert mock_ai_generator.generate_text.call_count == 2
+        inserted = [
+            c.kwargs["text"] for c in mock_template_handler.insert_text_after.call_args_list
+        ]
+        ai_texts = [t for t in inserted if t.startswith("text for ")]
+        assert ai_texts == [f"text for {ai_rule.prompt_template}", "text for second"]
+
 
 # ==================== 错误处理测试 ====================
 
@@ -91,6 +91,17 @@ class TestParagraphPositionFinding:
         # Assert
         assert para is None, "Should return None for non-existent text"
 
+    def test_find_paragraphs_by_texts(self, handler):
+        """Test finding several substrings in one pass."""
+        # Act
+        found = handler.find_paragraphs_by_texts(["research phase", "Purpose", "Nonexistent"])
+
+        # Assert
+        assert set(found) == {"research phase", "Purpose"}
+        assert found["Purpose"].text == "Purpose", "Should return the first containing paragraph"
+        assert found["research phase"]._element is \
+            handler.find_paragraph_by_text("research phase", exact_match=False)._element
+
     def test_find_paragraphs_by_style(self, handler):
         """Test finding paragraphs by style."""
         # Act
@@ -136,6 +147,34 @@ class TestParagraphPositionFinding:
         assert "Heading 2" in styles, "Should include Heading 2 style"
         assert "Normal" in styles, "Should include Normal style"
 
+    def test_find_sees_inserted_paragraphs(self, handler):
+        """Test that finds after an insertion see the new paragraph."""
+        # Arrange - populate the lookup cache
+        target_para = handler.find_paragraph_by_text("Purpose")
+        assert handler.find_paragraph_by_text("Inserted heading") is None
+
+        # Act
+        new_para = handler.insert_text_after(target_para, "Inserted heading")
+
+        # Assert
+        assert handler.find_paragraph_by_text("Inserted heading")._element is new_para._element
+        assert len(handler.find_paragraphs_by_style("Heading 1")) == 3
+
+    def test_batch_edits_defers_cache_rebuild(self, handler):
+        """Test that finds inside batch_edits use the pre-batch paragraphs until it exits."""
+        # Act
+        with handler.batch_edits():
+            target_para = handler.find_paragraph_by_text("Purpose")
+            handler.insert_text_after(target_para, "First insert")
+            handler.insert_text_after(handler.find_paragraph_by_text("Purpose"), "Second insert")
+
+            # Assert - original paragraphs still found, new ones not yet indexed
+            assert handler.find_paragraph_by_text("Purpose")._element is target_para._element
+            assert handler.find_paragraph_by_text("First insert") is None
+
+        assert handler.find_paragraph_by_text("First insert") is not None
+        assert handler.find_paragraph_by_text("Second insert") is not None
+
 
 # ==================== Test Text Insertion (Task 2.2.12) ====================
 
@@ -379,6 +418,66 @@ class TestDocumentSave:
         assert output_path.exists(), "Output file should be created"
         assert output_path.parent.exists(), "Output directory should be created"
 
+    def test_save_document_recreates_removed_directory(self, handler, temp_dir):
+        """Test saving again after the output directory was deleted."""
+        # Arrange
+        output_path = temp_dir / "reports" / "output.docx"
+        handler.save_document(str(output_path))
+        shutil.rmtree(output_path.parent)
+
+        # Act
+        handler.save_document(str(output_path))
+
+        # Assert
+        assert output_path.exists(), "Output file should be created again"
+
+
+# ==================== Template Loading Tests ====================
+
+class TestTemplateLoading:
+    """Test template loading from the in-process template cache."""
+
+    def test_handlers_get_independent_documents(self, test_template):
+        """Test edits in one handler don't leak into the next one."""
+        # Arrange
+        first = WordTemplateHandler(str(test_template))
+        count = first.get_paragraph_count()
+        first.insert_text_after(first.find_paragraph_by_text("Purpose"), "Added")
+
+        # Act
+        second = WordTemplateHandler(str(test_template))
+
+        # Assert
+        assert second.get_paragraph_count() == count
+
+    def test_modified_template_reloaded(self, test_template):
+        """Test a template edited on disk is read again."""
+        # Arrange
+        WordTemplateHandler(str(test_template))
+        doc = Document(str(test_template))
+        doc.add_paragraph('Appended after first load.')
+        doc.save(str(test_template))
+
+        # Act
+        handler = WordTemplateHandler(str(test_template))
+
+        # Assert
+        assert handler.find_paragraph_by_text('Appended after first load.') is not None
+
+    def test_shared_paragraph_index_uses_own_document(self, test_template):
+        """Test a handler reusing another handler's paragraph index finds its own paragraphs."""
+        # Arrange
+        first = WordTemplateHandler(str(test_template))
+        first.find_paragraph_by_text("Purpose")
+
+        # Act
+        second = WordTemplateHandler(str(test_template))
+        para = second.find_paragraph_by_text_and_style("Purpose", "Heading 1")
+
+        # Assert
+        assert para is not None
+        assert para._element is second.document.paragraphs[0]._element
+
 
 # ==================== Integration Tests ====================
 